@@ -1,4 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+class ApisConfig(AppConfig):
+    default = True
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apis'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .middleware import install_query_recorder
+        from .search import install_search_index
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(install_query_recorder)
 
 
 class loginConfig(AppConfig):
@@ -7,4 +22,4 @@ class loginConfig(AppConfig):
 
 class RegistrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'registration'
\ No newline at end of file
+    name = 'registration'
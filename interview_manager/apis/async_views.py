@@ -0,0 +1,73 @@
+"""
+Native async serving of the read-only interview listings.
+
+Under ASGI a synchronous view runs in a worker thread, and Django runs every
+such view on the same thread to keep database connections safe, so slow
+listings queue behind one another. `AsyncListView` handles GET on the event
+loop instead. It drives an existing DRF list view through its async twins
+(`aget`, else `alist`), so filtering, pagination, caching and rendering are
+the same code and the JSON is identical. Enabled with INTERVIEW_ASYNC_VIEWS.
+
+`EventStreamView` serves a DRF view's `stream()`, a server-sent event
+response, the same way. It is always async: a stream held open in a worker
+thread would take that thread for as long as the client stays connected.
+Under WSGI there is no event loop to hold it, so it answers 501 instead.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _drf_view(view_class, request, *args, **kwargs):
+    view = view_class()
+    view.setup(request, *args, **kwargs)
+    request = view.initialize_request(request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+    return view, request
+
+
+def _rendered(view, request, response, *args, **kwargs):
+    response = view.finalize_response(request, response, *args, **kwargs)
+    # Render here: the handler would otherwise render in a worker thread
+    response.render()
+    return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+
+class AsyncListView(View):
+    view_class = None
+
+    async def get(self, request, *args, **kwargs):
+        view, request = _drf_view(self.view_class, request, *args, **kwargs)
+        try:
+            # Token authentication is stateless, so this never touches the database
+            view.initial(request, *args, **kwargs)
+            handler = getattr(view, 'aget', None) or view.alist
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        return _rendered(view, request, response, *args, **kwargs)
+
+
+class EventStreamView(View):
+    view_class = None
+
+    async def get(self, request, *args, **kwargs):
+        served_by_asgi = isinstance(request, ASGIRequest)
+        view, request = _drf_view(self.view_class, request, *args, **kwargs)
+        try:
+            view.initial(request, *args, **kwargs)
+            if served_by_asgi:
+                response = view.stream(request, *args, **kwargs)
+            else:
+                response = Response(
+                    {"error": "Event streams are only served under ASGI."}, status=status.HTTP_501_NOT_IMPLEMENTED,
+                )
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        if response.streaming:
+            return view.finalize_response(request, response, *args, **kwargs)
+        # An error, rendered like any other
+        return _rendered(view, request, response, *args, **kwargs)
@@ -0,0 +1,129 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's JWTAuthentication reads the User row on every authenticated
+request. Tokens issued by `tokens_for_user` carry the fields the API needs
+(USER_CLAIMS), so `StatelessJWTAuthentication` builds `request.user` from the
+validated token alone. Revocation goes through an in-process denylist of
+token ids and per-user cut-off times, each kept only until every token it
+could match has expired. The denylist is per process: another worker keeps
+accepting a revoked access token until it expires (ACCESS_TOKEN_LIFETIME).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_CLAIMS = ('email', 'department', 'role')
+
+
+class TTLCache:
+    """A bounded LRU mapping whose entries are dropped at their expiry time."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._evict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._entries[key]
+            except KeyError:
+                return default
+            if expires_at <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def _evict(self):
+        now = time.time()
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Denylist:
+    def __init__(self, maxsize):
+        self._revoked = TTLCache(maxsize)
+
+    def revoke_token(self, token):
+        """Reject `token` (and only it) until it expires."""
+        self._revoked.set(('jti', token[api_settings.JTI_CLAIM]), True, token['exp'])
+
+    def revoke_user(self, user_id):
+        """
+        Reject every token issued to `user_id` before the current second.
+        `iat` has whole-second precision; a token issued later in this
+        second, such as one from logging in again, stays valid.
+        """
+        now = int(time.time())
+        lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+        self._revoked.set(('user', str(user_id)), now, now + lifetime.total_seconds())
+
+    def is_revoked(self, token):
+        if self._revoked.get(('jti', token.get(api_settings.JTI_CLAIM))):
+            return True
+        revoked_at = self._revoked.get(('user', str(token.get(api_settings.USER_ID_CLAIM))))
+        return revoked_at is not None and token.get('iat', 0) < revoked_at
+
+    def clear(self):
+        self._revoked.clear()
+
+
+denylist = Denylist(settings.AUTH_DENYLIST_SIZE)
+
+
+def tokens_for_user(user):
+    """A refresh token whose access tokens identify `user` without a lookup."""
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
+
+
+class ClaimsUser(TokenUser):
+    """`request.user` built from token claims; fields missing from older tokens are None."""
+
+    @cached_property
+    def email(self):
+        return self.token.get('email')
+
+    @cached_property
+    def department(self):
+        return self.token.get('department')
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if denylist.is_revoked(token):
+            raise InvalidToken({'detail': 'Token has been revoked.', 'code': 'token_revoked'})
+        return token
@@ -0,0 +1,83 @@
+"""
+Common free slots for a group of interviewers.
+
+Busy intervals of every interviewer in the group are read in one query,
+sorted by start, and merged on the fly by a sweep line. Free time is then
+each day's working window minus the merged busy intervals, cut into slots of
+the requested duration: O(n) after the database sort.
+"""
+import datetime
+
+from .intervals import interview_span
+from .models import Interview
+
+
+def merge_busy(spans):
+    """Union of `(start, end)` spans sorted by start, as sorted disjoint spans."""
+    merged_start = merged_end = None
+    for start, end in spans:
+        if merged_end is not None and start <= merged_end:
+            merged_end = max(merged_end, end)
+            continue
+        if merged_end is not None:
+            yield merged_start, merged_end
+        merged_start, merged_end = start, end
+    if merged_end is not None:
+        yield merged_start, merged_end
+
+
+def working_windows(start_date, end_date, day_start, day_end, include_weekends=False):
+    day = start_date
+    while day <= end_date:
+        if include_weekends or day.weekday() < 5:
+            yield datetime.datetime.combine(day, day_start), datetime.datetime.combine(day, day_end)
+        day += datetime.timedelta(days=1)
+
+
+def free_slots(busy, windows, duration, limit, step=None):
+    """
+    The first `limit` slots of length `duration` inside `windows` that miss
+    every interval in `busy`. Both inputs must be sorted by start; `busy`
+    must be disjoint. Slots within a gap start every `step` (default
+    `duration`).
+    """
+    step = step or duration
+    busy = iter(busy)
+    current = next(busy, None)
+    slots = []
+
+    for window_start, window_end in windows:
+        cursor = window_start
+        # Busy time running past the window stays current for the next one
+        while len(slots) < limit and cursor < window_end:
+            # Skip busy time that ended before the cursor
+            while current is not None and current[1] <= cursor:
+                current = next(busy, None)
+            if current is not None and current[0] <= cursor:
+                cursor = current[1]
+                continue
+
+            gap_end = window_end if current is None else min(window_end, current[0])
+            while cursor + duration <= gap_end and len(slots) < limit:
+                slots.append((cursor, cursor + duration))
+                cursor += step
+            if gap_end >= window_end:
+                break
+            cursor = current[1]
+        if len(slots) >= limit:
+            break
+    return slots
+
+
+def find_common_slots(interviewers, start_date, end_date, day_start, day_end, duration, limit,
+                      include_weekends=False, queryset=None):
+    queryset = Interview.objects.all() if queryset is None else queryset
+    # Start a day early to catch interviews running past midnight
+    rows = queryset.filter(
+        interviewer__in=interviewers,
+        date__range=[start_date - datetime.timedelta(days=1), end_date],
+    ).order_by('date', 'time').values_list('date', 'time', 'duration')
+
+    busy = merge_busy(interview_span(date, time, length) for date, time, length in rows.iterator())
+    windows = working_windows(start_date, end_date, day_start, day_end, include_weekends)
+    return free_slots(busy, windows, duration, limit)
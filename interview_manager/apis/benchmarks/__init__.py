@@ -0,0 +1,97 @@
+"""
+Benchmarks run through `manage.py benchmark <name>`.
+
+Each module documents what it measures in its first docstring line and
+returns plain dicts so runs can be saved and compared.
+"""
+import datetime
+import math
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+
+from apis.models import Department_Choice, Interview, User
+
+DEPARTMENTS = [choice for choice, _ in Department_Choice]
+ROLES = ['Junior', 'Senior', 'Team Lead', 'Manager', 'Intern']
+FIRST_NAMES = ['Aisha', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas']
+LAST_NAMES = ['Khan', 'Lopez', 'Müller', 'Nakamura', 'Okafor', 'Patel', 'Quinn', 'Rossi', 'Smith', 'Tanaka']
+# Interviews start on these times and last at most 90 minutes, so an
+# interviewer's generated bookings never overlap.
+SLOT_STARTS = [datetime.time(hour, minute) for hour, minute in ((9, 0), (10, 30), (12, 0), (13, 30), (15, 0), (16, 30))]
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def generate_interviews(count, start=datetime.date(2024, 1, 1), days=365, seed=0, interviewers=200,
+                        first_id=None):
+    """
+    Yield `count` unsaved, realistic-looking interviews spread over `days`.
+
+    More interviewers are added if needed to keep every interviewer's
+    bookings free of overlaps. Ids are only set when `first_id` is given.
+    """
+    rng = random.Random(seed)
+    slots = days * len(SLOT_STARTS)
+    interviewers = max(interviewers, math.ceil(count / slots))
+    per_interviewer, extra = divmod(count, interviewers)
+
+    n = 0
+    for interviewer in range(interviewers):
+        for slot in rng.sample(range(slots), per_interviewer + (interviewer < extra)):
+            day, slot_index = divmod(slot, len(SLOT_STARTS))
+            yield Interview(
+                id=None if first_id is None else first_id + n,
+                interviewee=f'Candidate {n}',
+                email=f'candidate{n}@example.com',
+                phone=f'{rng.randrange(10 ** 9, 10 ** 10)}',
+                date=start + datetime.timedelta(days=day),
+                time=SLOT_STARTS[slot_index],
+                duration=datetime.timedelta(minutes=rng.choice((30, 45, 60, 90))),
+                role=rng.choice(ROLES),
+                interviewer=f'Interviewer {interviewer}',
+                job_title='Software Engineer',
+                business_area='Platform',
+                department=rng.choice(DEPARTMENTS),
+                additional_notes=rng.choice((None, '', 'Bring a laptop.')),
+            )
+            n += 1
+
+
+def make_interviews(count, **kwargs):
+    """A list of `count` unsaved interviews with ids 1..count."""
+    return list(generate_interviews(count, first_id=1, **kwargs))
+
+
+def generate_users(count, seed=0):
+    """Yield `count` unsaved users sharing the password BENCHMARK_PASSWORD."""
+    rng = random.Random(seed)
+    # Hashing is deliberately slow; every seeded user shares one hash
+    password = make_password(BENCHMARK_PASSWORD)
+    for n in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield User(
+            email=f'{first_name.lower()}.{n}@bench.example.com',
+            first_name=first_name,
+            last_name=last_name,
+            department=rng.choice(DEPARTMENTS),
+            role=rng.choice(ROLES),
+            phone=f'{rng.randrange(10 ** 9, 10 ** 10)}',
+            password=password,
+        )
+
+
+def best_of(func, repeat):
+    """Best wall time of `repeat` calls, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
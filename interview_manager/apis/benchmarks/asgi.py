@@ -0,0 +1,150 @@
+"""
+Concurrent throughput of the interview listings under uvicorn, sync vs async views.
+
+Starts `uvicorn interview_manager.asgi:application` twice against the
+default database, once with INTERVIEW_ASYNC_VIEWS off and once with it on,
+and drives each with --concurrency keep-alive clients. The database must be
+one the server process can open too (PostgreSQL or a SQLite file), seeded
+with `manage.py seed_interviews`. Response bodies of both runs are compared.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+
+from apis.benchmarks import percentile
+from apis.benchmarks.routes import route_requests
+from apis.models import Interview
+
+ROUTES = [
+    'all-interviews',
+    'interviews-by-date',
+    'interviews-by-week',
+    'interviews-by-work-week',
+    'interviews-by-month',
+    'interviews-by-date-range',
+    'interviews-by-department',
+]
+
+
+def add_arguments(parser):
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per route and mode.')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--routes', nargs='*', default=ROUTES)
+
+
+def _wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'uvicorn exited with status {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'uvicorn did not start listening on port {port}')
+
+
+def _load(port, path, requests, concurrency):
+    """Send `requests` GETs from `concurrency` keep-alive connections."""
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    timings, statuses, bodies = [], set(), set()
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                conn.request('GET', path, headers={'Host': 'localhost'})
+                response = conn.getresponse()
+                body = response.read()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    timings.append(elapsed * 1000)
+                    statuses.add(response.status)
+                    bodies.add(body)
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests_per_second': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'statuses': sorted(statuses),
+    }, bodies
+
+
+def _serve(port, **environ):
+    """Start uvicorn on `port` with `environ` added to this process's environment."""
+    env = dict(os.environ, **{name: str(value) for name, value in environ.items()})
+    env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'interview_manager.asgi:application',
+         '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        cwd=settings.BASE_DIR, env=env,
+    )
+
+
+def run(requests, concurrency, port, routes=ROUTES, **options):
+    if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:'):
+        raise RuntimeError('The uvicorn process cannot share an in-memory SQLite database.')
+    sample = Interview.objects.order_by('id')[Interview.objects.count() // 2:].first()
+    if sample is None:
+        raise RuntimeError('No interviews to benchmark against; run manage.py seed_interviews first.')
+
+    specs = route_requests(sample)
+    paths = {}
+    for name in routes:
+        _, kwargs, data = specs[name](0)
+        paths[name] = f'{reverse(name, kwargs=kwargs)}?{urlencode(data)}'
+
+    results = {name: {} for name in routes}
+    bodies = {}
+    for mode in ('sync', 'async'):
+        server = _serve(port, INTERVIEW_ASYNC_VIEWS=mode == 'async')
+        try:
+            _wait_for_port(port, server)
+            for name, path in paths.items():
+                # Warm up connections, caches and the server's imports
+                _load(port, path, concurrency, concurrency)
+                results[name][mode], bodies[(name, mode)] = _load(port, path, requests, concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    for name in routes:
+        sync, async_ = results[name]['sync'], results[name]['async']
+        results[name]['speedup'] = round(async_['requests_per_second'] / sync['requests_per_second'], 2)
+        results[name]['identical'] = bodies[(name, 'sync')] == bodies[(name, 'async')]
+
+    return {
+        'meta': {
+            'vendor': connection.vendor,
+            'interviews': Interview.objects.count(),
+            'requests': requests,
+            'concurrency': concurrency,
+        },
+        'routes': results,
+    }
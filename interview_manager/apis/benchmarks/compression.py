@@ -0,0 +1,79 @@
+"""
+Bytes on the wire and CPU cost of compressing interview listings, per encoding and response size.
+
+Runs in memory without a database: each size is rendered once as JSON (and
+as MessagePack when msgpack is installed) from generated rows, then
+compressed whole with every encoding in COMPRESSION_ENCODINGS, as the
+middleware does for a listing. `streamed` compresses the largest JSON body
+in INTERVIEW_EXPORT_CHUNK_SIZE-row chunks, flushing after each, as it does
+for an export.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from apis import compression
+from apis.benchmarks import best_of, make_interviews
+from apis.encoders import row_encoder_for
+from apis.renderers import MessagePackRenderer, NDJSONRenderer
+from apis.serializers import InterviewSerializer
+
+SIZES = [10, 100, 1000, 10000]
+
+
+def add_arguments(parser):
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES, help='Rows per response.')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def _measure(body, encoding, repeat):
+    compressed = compression.compress(body, encoding)
+    elapsed = best_of(lambda: compression.compress(body, encoding), repeat)
+    return {
+        'bytes': len(compressed),
+        'ratio': round(len(compressed) / len(body), 3),
+        'ms': round(elapsed * 1000, 3),
+        'mb_per_s': round(len(body) / elapsed / 1e6, 1),
+    }
+
+
+def run(sizes=SIZES, repeat=5, **options):
+    encoder = row_encoder_for(InterviewSerializer)
+    interviews = make_interviews(max(sizes))
+    rows = encoder.encode([tuple(getattr(interview, column) for column in encoder.columns) for interview in interviews])
+    renderers = {'json': JSONRenderer()}
+    if settings.INTERVIEW_MSGPACK:
+        renderers['msgpack'] = MessagePackRenderer()
+
+    results = {}
+    for size in sizes:
+        for name, renderer in renderers.items():
+            body = renderer.render(rows[:size])
+            results[f'{name}_{size}'] = {
+                'rows': size,
+                'bytes': len(body),
+                'render_ms': round(best_of(lambda: renderer.render(rows[:size]), repeat) * 1000, 3),
+                **{encoding: _measure(body, encoding, repeat) for encoding in settings.COMPRESSION_ENCODINGS},
+            }
+
+    chunk_size = settings.INTERVIEW_EXPORT_CHUNK_SIZE
+    ndjson = NDJSONRenderer()
+    chunks = [ndjson.render_rows(rows[start:start + chunk_size]) for start in range(0, len(rows), chunk_size)]
+    streamed = {}
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        elapsed = best_of(lambda: list(compression.compress_stream(chunks, encoding)), repeat)
+        streamed[encoding] = {
+            'bytes': sum(map(len, compression.compress_stream(chunks, encoding))),
+            'whole_bytes': len(compression.compress(b''.join(chunks), encoding)),
+            'ms': round(elapsed * 1000, 3),
+        }
+
+    return {
+        'meta': {
+            'encodings': settings.COMPRESSION_ENCODINGS,
+            'min_bytes': settings.COMPRESSION_MIN_BYTES,
+            'streamed_rows': len(rows),
+            'chunk_rows': chunk_size,
+        },
+        'responses': results,
+        'streamed': streamed,
+    }
@@ -0,0 +1,85 @@
+"""
+Per-request latency with a new database connection per request, persistent connections and a pool.
+
+Starts `uvicorn interview_manager.asgi:application` once per variant, with
+DB_POOL and DB_CONN_MAX_AGE set in its environment, and sends --requests
+GETs per route from --concurrency keep-alive clients:
+
+- `per_request`: CONN_MAX_AGE=0, a new connection (TCP and auth handshake)
+  for every request, the old default.
+- `persistent`: CONN_MAX_AGE=60, each server thread keeps its connection.
+- `pool`: a psycopg pool (PostgreSQL with psycopg_pool installed only).
+
+The variants only differ under settings that read those variables, such as
+the project's own. The database must be one the server process can open.
+"""
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.urls import reverse
+
+from apis.benchmarks.asgi import _load, _serve, _wait_for_port
+from apis.benchmarks.routes import route_requests
+from apis.models import Interview
+
+ROUTES = ['get-roles', 'interviews-by-date']
+
+VARIANTS = {
+    'per_request': {'DB_POOL': False, 'DB_CONN_MAX_AGE': 0},
+    'persistent': {'DB_POOL': False, 'DB_CONN_MAX_AGE': 60},
+    'pool': {'DB_POOL': True},
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per route and variant.')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--routes', nargs='*', default=ROUTES)
+    parser.add_argument('--variants', nargs='*', default=list(VARIANTS), choices=list(VARIANTS))
+
+
+def run(requests, concurrency, port, routes=ROUTES, variants=tuple(VARIANTS), **options):
+    if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:'):
+        raise RuntimeError('The uvicorn process cannot share an in-memory SQLite database.')
+    sample = Interview.objects.order_by('id').first()
+    if sample is None:
+        raise RuntimeError('No interviews to benchmark against; run manage.py seed_interviews first.')
+
+    specs = route_requests(sample)
+    paths = {}
+    for name in routes:
+        _, kwargs, data = specs[name](0)
+        paths[name] = f'{reverse(name, kwargs=kwargs)}?{urlencode(data)}'
+
+    results = {name: {} for name in routes}
+    skipped = []
+    for variant in variants:
+        if variant == 'pool' and connection.vendor != 'postgresql':
+            skipped.append(variant)
+            continue
+        server = _serve(port, **VARIANTS[variant])
+        try:
+            _wait_for_port(port, server)
+            for name, path in paths.items():
+                _load(port, path, concurrency, concurrency)
+                results[name][variant], _ = _load(port, path, requests, concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    for variants_run in results.values():
+        baseline = variants_run.get('per_request')
+        for variant, result in variants_run.items():
+            if baseline and variant != 'per_request':
+                result['p50_saved_ms'] = round(baseline['p50_ms'] - result['p50_ms'], 3)
+
+    return {
+        'meta': {
+            'vendor': connection.vendor,
+            'requests': requests,
+            'concurrency': concurrency,
+        },
+        'routes': results,
+        'skipped': skipped,
+    }
@@ -0,0 +1,96 @@
+"""
+Payload size and latency of interview listings and exports per ?fields= fieldset.
+
+Run against the seeded default database. Takes the first dates holding
+about --rows interviews and reads them through the date-range listing
+(following `next` in pages of INTERVIEW_MAX_PAGE_SIZE) and the NDJSON
+export, once per fieldset. Latency is the p50 of --repeat reads; sizes are
+response bytes.
+"""
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from apis.benchmarks import percentile
+from apis.models import Interview
+
+FIELDSETS = ['full', 'calendar', 'date,time']
+
+
+def add_arguments(parser):
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--fieldsets', nargs='*', default=FIELDSETS)
+
+
+def _window(rows):
+    """The first and last of the earliest dates holding at least `rows` interviews, and their count."""
+    counts = Interview.objects.order_by('date').values('date').annotate(interviews=Count('id'))
+    first, total = None, 0
+    for bucket in counts.iterator():
+        first = first or bucket['date']
+        total += bucket['interviews']
+        if total >= rows:
+            break
+    return first, bucket['date'], total
+
+
+def _read_listing(client, params):
+    url = f"{reverse('interviews-by-date-range')}?{urlencode(params)}"
+    elapsed = size = 0
+    while url:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed += time.perf_counter() - started
+        size += len(response.content)
+        url = response.json()['next']
+    return elapsed, size
+
+
+def _read_export(client, params):
+    started = time.perf_counter()
+    response = client.get(reverse('export-interviews'), params)
+    size = len(b''.join(response.streaming_content))
+    return time.perf_counter() - started, size
+
+
+def _measure(read, client, params, repeat):
+    read(client, params)
+    timings = []
+    for _ in range(repeat):
+        elapsed, size = read(client, params)
+        timings.append(elapsed * 1000)
+    return {'bytes': size, 'p50_ms': round(percentile(timings, 0.5), 3)}
+
+
+def run(rows, repeat, fieldsets=FIELDSETS, **options):
+    start, end, total = _window(rows)
+    if start is None:
+        raise RuntimeError('No interviews to benchmark against; run manage.py seed_interviews first.')
+    window = {'start_date': start.isoformat(), 'end_date': end.isoformat()}
+    client = Client(HTTP_HOST='localhost')
+
+    results = {'listing': {}, 'export': {}}
+    for fields in fieldsets:
+        results['listing'][fields] = _measure(
+            _read_listing, client, {**window, 'fields': fields, 'page_size': settings.INTERVIEW_MAX_PAGE_SIZE},
+            repeat,
+        )
+        results['export'][fields] = _measure(_read_export, client, {**window, 'fields': fields}, repeat)
+
+    for measured in results.values():
+        full = measured.get('full')
+        for fields, result in measured.items():
+            if full and fields != 'full':
+                result['bytes_vs_full'] = round(result['bytes'] / full['bytes'], 3)
+                result['p50_vs_full'] = round(result['p50_ms'] / full['p50_ms'], 3)
+
+    return {
+        'meta': {'vendor': connection.vendor, 'rows': total, **window, 'repeat': repeat},
+        **results,
+    }
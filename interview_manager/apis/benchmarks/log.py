@@ -0,0 +1,82 @@
+"""
+Request-thread cost of logging one login event, print() vs apis.log.
+
+Each variant logs the same login event --records times, the way
+LoginSerializer does once per login, into a sink whose writes block for
+--sink-latency-us like a busy pipe to a log shipper. The reported cost is
+the time the calling thread spends; for the queued variants the time to
+drain the queue afterwards is reported separately.
+"""
+import logging
+import tempfile
+import time
+
+from apis.log import EventFilter, JSONFormatter, QueueingHandler
+
+
+def add_arguments(parser):
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--sink-latency-us', type=int, default=50)
+
+
+class SlowSink:
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _logger(name, handler):
+    logger = logging.Logger(f'benchmark.{name}')
+    logger.addHandler(handler)
+    return logger
+
+
+def _per_call_us(func, records):
+    started = time.perf_counter()
+    for n in range(records):
+        func(n)
+    return (time.perf_counter() - started) / records * 1e6
+
+
+def run(records, sink_latency_us, **options):
+    results = {}
+    with tempfile.TemporaryFile('w') as stream:
+        sink = SlowSink(stream, sink_latency_us / 1e6)
+        results['print'] = {
+            'per_call_us': round(_per_call_us(
+                lambda n: print(f"Login successful for user 'user{n}@example.com'.", file=sink, flush=True), records,
+            ), 2),
+        }
+
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JSONFormatter())
+        logger = _logger('stream', handler)
+        results['json_stream'] = {
+            'per_call_us': round(_per_call_us(lambda n: logger.info('Login succeeded', extra={
+                'event': 'login.succeeded', 'user_id': n, 'email': f'user{n}@example.com',
+            }), records), 2),
+        }
+
+        for name, events in (('json_queue', {}), ('json_queue_sampled', {'login.succeeded': {'sample': 0.1}})):
+            handler = QueueingHandler(sink)
+            handler.setFormatter(JSONFormatter())
+            handler.addFilter(EventFilter(events))
+            logger = _logger(name, handler)
+            per_call = _per_call_us(lambda n: logger.info('Login succeeded', extra={
+                'event': 'login.succeeded', 'user_id': n, 'email': f'user{n}@example.com',
+            }), records)
+            started = time.perf_counter()
+            handler.close()
+            results[name] = {
+                'per_call_us': round(per_call, 2),
+                'drain_ms': round((time.perf_counter() - started) * 1000, 1),
+            }
+
+    return {'meta': {'records': records, 'sink_latency_us': sink_latency_us}, 'variants': results}
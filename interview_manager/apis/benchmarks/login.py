@@ -0,0 +1,92 @@
+"""
+Login requests per second per CPU core, for each password hasher.
+
+Every hasher logs the same user in --logins times through the login view, in
+one thread, so CPU time per login is the hash cost plus the request
+overhead. `upgrade` times the first login of a user whose hash was made
+with PBKDF2 under the preferred hasher, which includes the rehash.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from apis.benchmarks import BENCHMARK_PASSWORD
+from apis.logins import last_logins
+from apis.models import User
+
+EMAIL = 'bench-hasher-{}@bench.example.com'
+
+
+def add_arguments(parser):
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--hashers', nargs='*', default=list(settings.PASSWORD_HASHER_CHOICES),
+                        choices=list(settings.PASSWORD_HASHER_CHOICES))
+
+
+def _user(name, encoded):
+    return User.objects.create(
+        email=EMAIL.format(name), password=encoded, first_name='Bench', last_name='Hasher',
+        department='Software', role='Junior',
+    )
+
+
+def _login(client, user):
+    response = client.post(
+        reverse('login'), {'email': user.email, 'password': BENCHMARK_PASSWORD}, content_type='application/json',
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f'Login failed with status {response.status_code}: {response.content!r}')
+
+
+def _measure(client, user, logins):
+    queries = []
+    started, cpu_started = time.perf_counter(), time.process_time()
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        for _ in range(logins):
+            _login(client, user)
+    wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    return {
+        'logins_per_second': round(logins / wall, 1),
+        'logins_per_core_second': round(logins / cpu, 1),
+        'queries_per_login': round(len(queries) / logins, 2),
+    }
+
+
+def run(logins, hashers, **options):
+    client = Client(HTTP_HOST='localhost')
+    results = {}
+    try:
+        for name in hashers:
+            path = settings.PASSWORD_HASHER_CHOICES[name]
+            with override_settings(PASSWORD_HASHERS=[path] + [p for p in settings.PASSWORD_HASHERS if p != path]):
+                try:
+                    user = _user(name, make_password(BENCHMARK_PASSWORD))
+                except (ValueError, ImportError) as exc:
+                    # Argon2 without argon2-cffi installed
+                    results[name] = {'error': str(exc)}
+                    continue
+                _login(client, user)
+                results[name] = _measure(client, user, logins)
+
+        preferred = get_hasher()
+        user = _user('upgrade', make_password(BENCHMARK_PASSWORD, hasher='pbkdf2_sha256'))
+        started = time.perf_counter()
+        _login(client, user)
+        user.refresh_from_db()
+        results['upgrade'] = {
+            'first_login_ms': round((time.perf_counter() - started) * 1000, 1),
+            'rehashed_to': user.password.split('$', 1)[0],
+            'preferred': preferred.algorithm,
+        }
+    finally:
+        last_logins.flush()
+        User.objects.filter(email__startswith='bench-hasher-').delete()
+
+    return {
+        'meta': {'vendor': connection.vendor, 'logins': logins},
+        'hashers': results,
+    }
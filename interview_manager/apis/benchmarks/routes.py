@@ -0,0 +1,185 @@
+"""
+Latency, query count and peak memory of every named route in apis/urls.py.
+
+Run against whatever the default database holds; seed it first with
+`manage.py seed_interviews`. Write requests clean up after themselves.
+Results can be saved with --output and compared with --baseline: a route
+regresses when its p95 grows by more than --threshold or it issues more
+queries than before.
+"""
+import json
+import time
+import tracemalloc
+import uuid
+
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, reverse
+
+from apis import urls
+from apis.benchmarks import BENCHMARK_PASSWORD, percentile
+from apis.models import Interview, User
+
+RUN_TAG = 'Benchmark run'
+
+
+def add_arguments(parser):
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--routes', nargs='*', help='Only these route names.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', help='Compare against results saved by an earlier run.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative p95 growth before a route counts as regressed.')
+
+
+def _interview_payload(n):
+    return {
+        'interviewee': f'{RUN_TAG} {n}', 'email': 'bench@example.com', 'phone': '5550000000',
+        'date': '2030-01-01', 'time': '09:00', 'duration': '00:30:00', 'role': 'Junior',
+        'interviewer': f'{RUN_TAG} {uuid.uuid4().hex}', 'job_title': 'Engineer',
+        'business_area': 'Platform', 'department': 'Software',
+    }
+
+
+def route_requests(sample):
+    """
+    Map each route name to a function of the iteration number returning
+    `(method, reverse kwargs, data)`. Routes missing here are reported as
+    skipped so new endpoints get noticed.
+    """
+    date = sample.date.isoformat()
+    month = {'month': sample.date.month, 'year': sample.date.year}
+    return {
+        'login': lambda n: ('post', {}, {'email': 'bench-login@bench.example.com', 'password': BENCHMARK_PASSWORD}),
+        'register': lambda n: ('post', {}, {
+            'email': f'bench-run-{uuid.uuid4().hex}@bench.example.com', 'first_name': 'Bench', 'last_name': 'Run',
+            'password': BENCHMARK_PASSWORD, 'password2': BENCHMARK_PASSWORD, 'department': 'Software', 'role': 'Junior',
+        }),
+        'schedule-interview': lambda n: ('post', {}, _interview_payload(n)),
+        'bulk-schedule-interviews': lambda n: ('post', {}, [_interview_payload(n) for _ in range(50)]),
+        'all-interviews': lambda n: ('get', {}, {}),
+        'interviews-by-date': lambda n: ('get', {}, {'date': date}),
+        'interviews-by-week': lambda n: ('get', {}, {}),
+        'interviews-by-work-week': lambda n: ('get', {}, {}),
+        'interviews-by-month': lambda n: ('get', {}, month),
+        'interviews-by-date-range': lambda n: ('get', {}, {'start_date': date, 'end_date': date}),
+        'export-interviews': lambda n: ('get', {}, {'format': 'ndjson', **month}),
+        'interview-conflicts': lambda n: ('get', {}, {'start_date': date, 'end_date': date}),
+        'interviewer-availability': lambda n: ('get', {}, {
+            'interviewers': sample.interviewer or '', 'start_date': date, 'end_date': date, 'duration': 30,
+        }),
+        'interview-stats': lambda n: ('get', {}, {
+            'start_date': sample.date.replace(day=1).isoformat(), 'end_date': date, 'group_by': 'week',
+        }),
+        'get-roles': lambda n: ('get', {}, {}),
+        'metrics': lambda n: ('get', {}, {}),
+        'interviews-by-department': lambda n: ('get', {}, {'department': sample.department}),
+        'retrieve-update-destroy-interview': lambda n: ('get', {'pk': sample.pk}, {}),
+        'search_users': lambda n: ('get', {}, {'q': 'smi'}),
+    }
+
+
+def _send(client, name, spec):
+    method, kwargs, data = spec
+    path = reverse(name, kwargs=kwargs)
+    if method == 'get':
+        response = client.get(path, data)
+    else:
+        response = client.post(path, json.dumps(data), content_type='application/json')
+    if response.streaming:
+        # Exports only do their work while being consumed
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, name, request_for, iterations, warmup):
+    for n in range(warmup):
+        _send(client, name, request_for(n))
+
+    timings = []
+    for n in range(iterations):
+        started = time.perf_counter()
+        response = _send(client, name, request_for(n))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # CaptureQueriesContext loses its log to the reset on request_started,
+    # so count executions directly
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        _send(client, name, request_for(iterations))
+
+    tracemalloc.start()
+    try:
+        _send(client, name, request_for(iterations + 1))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def run(iterations, warmup, routes=None, output=None, baseline=None, threshold=0.2, **options):
+    sample = Interview.objects.order_by('id')[Interview.objects.count() // 2:].first()
+    if sample is None:
+        raise RuntimeError('No interviews to benchmark against; run manage.py seed_interviews first.')
+    if not User.objects.filter(email='bench-login@bench.example.com').exists():
+        User.objects.create_user(
+            email='bench-login@bench.example.com', password=BENCHMARK_PASSWORD,
+            department='Software', role='Junior', first_name='Bench', last_name='Login',
+        )
+
+    names = [pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern) and pattern.name]
+    requests = route_requests(sample)
+    client = Client(HTTP_HOST='localhost')
+
+    results, skipped = {}, []
+    try:
+        for name in names:
+            if routes and name not in routes:
+                continue
+            if name not in requests:
+                skipped.append(name)
+                continue
+            results[name] = measure(client, name, requests[name], iterations, warmup)
+    finally:
+        Interview.objects.filter(interviewee__startswith=RUN_TAG).delete()
+        User.objects.filter(email__startswith='bench-run-').delete()
+
+    report = {
+        'meta': {
+            'vendor': connection.vendor,
+            'interviews': Interview.objects.count(),
+            'users': User.objects.count(),
+            'iterations': iterations,
+        },
+        'routes': results,
+        'skipped': skipped,
+    }
+    if baseline:
+        with open(baseline) as f:
+            report['regressions'] = compare(results, json.load(f)['routes'], threshold)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
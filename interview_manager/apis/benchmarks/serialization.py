@@ -0,0 +1,78 @@
+"""
+Interview list serialization: InterviewSerializer vs the RowEncoder fast path.
+
+Run against the seeded default database, on its first --rows interviews, so
+every column (updated_at included) holds what the list views really read.
+Both paths are timed in memory on rows fetched once: the serializer gets
+model instances and the encoder the tuples `values_list()` returns. The
+`load_serialize_render` figures also charge each path for turning raw
+database rows into its input, as the list views do on every request.
+
+A `serialize` speedup below --target is reported as a regression, which
+fails the command. The other figures include rendering, which costs both
+paths the same, and are reported for comparison.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from apis.benchmarks import best_of
+from apis.encoders import row_encoder_for
+from apis.models import Interview
+from apis.serializers import InterviewSerializer
+
+
+def add_arguments(parser):
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target', type=float, default=5.0,
+                        help='Lowest acceptable encoder speedup at serializing.')
+
+
+def _speedup(rows, serializer_time, encoder_time):
+    return {
+        'serializer_rows_per_s': round(rows / serializer_time),
+        'encoder_rows_per_s': round(rows / encoder_time),
+        'speedup': round(serializer_time / encoder_time, 1),
+    }
+
+
+def run(rows, repeat, target=5.0, **options):
+    queryset = Interview.objects.order_by('id')[:rows]
+    interviews = list(queryset)
+    if len(interviews) < rows:
+        raise RuntimeError(
+            f'Only {len(interviews)} interviews to benchmark against; run manage.py seed_interviews first.'
+        )
+    encoder = row_encoder_for(InterviewSerializer)
+    tuples = list(queryset.values_list(*encoder.columns))
+    attnames = [field.attname for field in Interview._meta.concrete_fields]
+    model_rows = list(queryset.values_list(*attnames))
+    renderer = JSONRenderer()
+
+    def serializer_path():
+        loaded = [Interview.from_db('default', attnames, row) for row in model_rows]
+        return renderer.render(InterviewSerializer(loaded, many=True).data)
+
+    serializer_data = InterviewSerializer(interviews, many=True).data
+    encoder_data = encoder.encode(tuples)
+    identical = renderer.render(serializer_data) == renderer.render(encoder_data)
+
+    serializer_time = best_of(lambda: InterviewSerializer(interviews, many=True).data, repeat)
+    encoder_time = best_of(lambda: encoder.encode(tuples), repeat)
+    serializer_total = best_of(lambda: renderer.render(InterviewSerializer(interviews, many=True).data), repeat)
+    encoder_total = best_of(lambda: renderer.render(encoder.encode(tuples)), repeat)
+    serializer_full = best_of(serializer_path, repeat)
+
+    results = {
+        'rows': rows,
+        'identical_json': identical,
+        'target': target,
+        'serialize': _speedup(rows, serializer_time, encoder_time),
+        'serialize_and_render': _speedup(rows, serializer_total, encoder_total),
+        'load_serialize_render': _speedup(rows, serializer_full, encoder_total),
+    }
+    results['regressions'] = []
+    if results['serialize']['speedup'] < target:
+        results['regressions'].append(f"serialize: {results['serialize']['speedup']}x is below the {target}x target")
+    if not identical:
+        results['regressions'].append('encoder output differs from InterviewSerializer output')
+    return results
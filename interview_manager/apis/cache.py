@@ -0,0 +1,124 @@
+"""
+Versioned response cache for the calendar endpoints.
+
+Every date has a version in the cache: the time, in nanoseconds, it was last
+bumped. A response is stored under a key built from the endpoint, its
+normalized date window, the remaining query parameters and the current
+version of every date in the window. Saving or deleting an interview bumps
+the versions of the dates it touched, so only the windows containing those
+dates miss on their next read; orphaned entries simply age out. A response
+read from a replica (apis/routers.py) soon after a bump may predate the
+write, so it is served but not stored.
+"""
+import datetime
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .routers import reading_from_replica
+
+VERSION_KEY = 'interview:version:{}'
+RESPONSE_KEY = 'interview:response:{}'
+
+
+def _version_key(date):
+    return VERSION_KEY.format(date.isoformat() if hasattr(date, 'isoformat') else date)
+
+
+def window_dates(start, end):
+    return [start + datetime.timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def get_versions(dates):
+    keys = [_version_key(date) for date in dates]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # A counter that was evicted or never set must not restart at a value
+        # an older entry was stored under, so seed it from the clock.
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+def bump_dates(dates):
+    """Invalidate every cached window that contains one of `dates`."""
+    keys = [_version_key(date) for date in set(dates)]
+    current = cache.get_many(keys)
+    # Never reuse a version, even if the clock steps back
+    cache.set_many({key: max(time.time_ns(), current.get(key, 0) + 1) for key in keys}, timeout=None)
+
+
+def replica_may_lag(versions):
+    """Whether a replica read could predate the last bump of `versions`."""
+    if not reading_from_replica():
+        return False
+    newest = max((version or 0 for version in versions), default=0)
+    return time.time_ns() - newest < settings.DATABASE_PRIMARY_PIN_SECONDS * 1_000_000_000
+
+
+def response_key(endpoint, start, end, params, versions):
+    raw = repr((endpoint, start.isoformat(), end.isoformat(), sorted(params), versions))
+    return RESPONSE_KEY.format(hashlib.sha1(raw.encode()).hexdigest())
+
+
+class WindowCacheMixin:
+    """
+    Cache the response data of a list view that defines `get_window()`.
+
+    Query parameters named in `window_params` are already folded into the
+    window, so they are left out of the key: `?month=05&year=2024` and
+    `?month=5&year=2024` share an entry.
+    """
+    window_params = ()
+    _cache_key = None
+
+    def get_cache_key(self):
+        """
+        The cache key for this request's window and the current versions of
+        its dates, read once per request.
+        """
+        if self._cache_key is None:
+            start, end = self.get_window()
+            params = [
+                (name, tuple(values)) for name, values in self.request.query_params.lists()
+                if name not in self.window_params
+            ]
+            versions = get_versions(window_dates(start, end))
+            self._cache_key = response_key(type(self).__name__, start, end, params, versions), versions
+        return self._cache_key
+
+    def get_cached(self):
+        """
+        The cache key for this request's window and the data stored under
+        it; the key is None when a fresh response must not be stored.
+        """
+        key, versions = self.get_cache_key()
+        data = cache.get(key)
+        return (None if replica_may_lag(versions) else key), data
+
+    def list(self, request, *args, **kwargs):
+        key, data = self.get_cached()
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if key is not None and response.status_code == 200:
+            cache.set(key, response.data, settings.INTERVIEW_CACHE_TIMEOUT)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        # One hop to a worker thread for the lookup, rather than one per call
+        key, data = await sync_to_async(self.get_cached)()
+        if data is not None:
+            return Response(data)
+
+        response = await super().alist(request, *args, **kwargs)
+        if key is not None and response.status_code == 200:
+            await cache.aset(key, response.data, settings.INTERVIEW_CACHE_TIMEOUT)
+        return response
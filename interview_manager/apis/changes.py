@@ -0,0 +1,301 @@
+"""
+Ordered feed of interview changes, for dashboards that would otherwise poll.
+
+Every create, update and delete of an interview appends an InterviewChange
+row from its post_save or post_delete handler. API writes run in a
+transaction (serializers.double_booking_guard, or the detail view's atomic
+update and delete) and the append joins it, so a write and its log entry
+commit together. A save made outside any transaction has already committed
+when its handler runs: the append then commits on its own just after, and a
+crash in between leaves that change out of the log.
+
+A change's id is the sequence number a client resumes from, so ids must
+become visible in increasing order: a reader that has seen id n must never
+later find a smaller one. A sequence alone does not ensure that, because
+transactions commit in a different order than they draw ids. On PostgreSQL
+each append therefore takes one advisory lock, held until its transaction
+ends. The append is the last statement of every API write, so writers only
+queue for the log insert and the commit, not for the write itself. (SQLite
+has a single writer anyway.)
+
+Once the write commits its id is published to a broker, which wakes the open
+event streams of every process. `LocalBroker` reaches the streams of this
+process only and is what tests and single-process servers use; `RedisBroker`
+fans out through a Redis channel. Either way the log is the source of truth:
+a stream re-reads it after a wakeup, and every CHANGE_FEED_POLL_SECONDS
+without one, so a lost message delays an event but never drops it.
+
+Clients that sync on demand instead, such as offline mobile apps, read the
+same log in pages through `changes_since()`.
+
+Pruning deletes a prefix of the log and records its end in the watermark
+(tasks.prune_interview_changes). Only a resume point behind the watermark
+has missed changes: ids can also skip because of rolled back appends or
+sequence caching, and such gaps are not expiry.
+"""
+import asyncio
+import json
+import threading
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max, Q
+
+from .encoders import row_encoder_for
+from .models import Interview, InterviewChange, InterviewChangeWatermark
+
+# Advisory lock serializing appends to the log until their transaction ends
+_APPEND_LOCK_ID = zlib.crc32(b'interview_change')
+
+CHANNEL = 'interview:changes'
+
+
+class LocalBroker:
+    """In-process pub/sub: wakes the streams subscribed in this process."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, sequence):
+        # Called from whichever thread committed the write
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, event in subscribers:
+            loop.call_soon_threadsafe(event.set)
+
+    def subscribe(self):
+        """
+        An async context manager giving an asyncio.Event that is set whenever
+        a change is published.
+        """
+        return _LocalSubscription(self)
+
+
+class _LocalSubscription:
+    # A class rather than an asynccontextmanager generator: a stream dropped
+    # mid-wait is finalized by the garbage collector, which would close a
+    # nested generator separately and out of order
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def __aenter__(self):
+        self.subscriber = (asyncio.get_running_loop(), asyncio.Event())
+        with self.broker._lock:
+            self.broker._subscribers.add(self.subscriber)
+        return self.subscriber[1]
+
+    async def __aexit__(self, *exc_info):
+        with self.broker._lock:
+            self.broker._subscribers.discard(self.subscriber)
+
+
+class RedisBroker:
+    """Pub/sub through a Redis channel, reaching the streams of every process."""
+
+    def __init__(self, url, channel=CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._publisher = None
+
+    def publish(self, sequence):
+        if self._publisher is None:
+            import redis
+
+            self._publisher = redis.Redis.from_url(self.url)
+        self._publisher.publish(self.channel, sequence)
+
+    def subscribe(self):
+        return _RedisSubscription(self)
+
+
+class _RedisSubscription:
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def __aenter__(self):
+        from redis import asyncio as aioredis
+
+        self.client = aioredis.Redis.from_url(self.broker.url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.broker.channel)
+        event = asyncio.Event()
+
+        async def listen():
+            async for message in self.pubsub.listen():
+                event.set()
+
+        self.listener = asyncio.create_task(listen())
+        return event
+
+    async def __aexit__(self, *exc_info):
+        self.listener.cancel()
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    if settings.CHANGE_FEED_BROKER == 'redis':
+        return RedisBroker(settings.REDIS_URL)
+    return LocalBroker()
+
+
+def _render(instance):
+    # Imported here: serializers imports signals, which imports this module
+    from .serializers import InterviewSerializer
+
+    encoder = row_encoder_for(InterviewSerializer)
+    row = tuple(
+        Interview._meta.get_field(column).to_python(getattr(instance, column)) for column in encoder.columns
+    )
+    return encoder.encode([row])[0]
+
+
+def change_for(instance, action):
+    """An unsaved InterviewChange recording `action` on `instance`."""
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    date = Interview._meta.get_field('date').to_python(instance.date)
+    change = InterviewChange(
+        interview_id=instance.pk, action=action, date=date, department=instance.department,
+        data=None if action == InterviewChange.DELETED else _render(instance),
+    )
+    if action == InterviewChange.UPDATED:
+        previous_date = loaded.get('date', date)
+        previous_department = loaded.get('department', instance.department)
+        if (previous_date, previous_department) != (date, instance.department):
+            change.previous_date, change.previous_department = previous_date, previous_department
+    return change
+
+
+def record(changes, using='default'):
+    """Append `changes` to the log and publish the newest once they commit."""
+    if not changes:
+        return
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [_APPEND_LOCK_ID])
+        InterviewChange.objects.using(using).bulk_create(changes)
+    newest = max(change.id for change in changes)
+    transaction.on_commit(lambda: get_broker().publish(newest), using=using, robust=True)
+
+
+class LogExpired(Exception):
+    """Changes after the requested sequence number were already pruned."""
+
+
+def pruned_through():
+    return InterviewChangeWatermark.objects.values_list('pruned_through', flat=True).first() or 0
+
+
+async def apruned_through():
+    return await InterviewChangeWatermark.objects.values_list('pruned_through', flat=True).afirst() or 0
+
+
+def changes_since(since, limit):
+    """
+    The net effect of the next `limit` changes after sequence number `since`,
+    one range read of the log's primary key: the current form of each
+    interview created or updated, ids of those deleted (tombstones), the
+    sequence number to continue from and whether more changes follow.
+    Raises LogExpired when pruning removed changes the caller has not seen.
+    """
+    page = list(
+        InterviewChange.objects.filter(id__gt=since).order_by('id')
+        .only('id', 'interview_id', 'action', 'data')[:limit + 1]
+    )
+    more = len(page) > limit
+    page = page[:limit]
+    # Without a gap after `since` nothing can be missing, so the common case stays one query
+    if page and page[0].id > since + 1 and since < pruned_through():
+        raise LogExpired(since)
+
+    # Only an interview's last change in the page matters
+    latest = {}
+    for change in page:
+        latest.pop(change.interview_id, None)
+        latest[change.interview_id] = change
+    return {
+        'interviews': [change.data for change in latest.values() if change.action != InterviewChange.DELETED],
+        'deleted': [change.interview_id for change in latest.values() if change.action == InterviewChange.DELETED],
+        'next': page[-1].id if page else since,
+        'more': more,
+    }
+
+
+def _matching(start_date=None, end_date=None, department=None):
+    # An update that moved an interview is news on both sides of the move
+    condition = Q()
+    if start_date is not None:
+        condition &= Q(date__range=[start_date, end_date]) | Q(previous_date__range=[start_date, end_date])
+    if department:
+        condition &= Q(department=department) | Q(previous_department=department)
+    return condition
+
+
+def format_event(change):
+    data = {
+        'id': change.interview_id,
+        'date': change.date.isoformat(),
+        'department': change.department,
+        'interview': change.data,
+    }
+    if change.previous_date is not None:
+        data['previous_date'] = change.previous_date.isoformat()
+        data['previous_department'] = change.previous_department
+    return f'id: {change.id}\nevent: {change.action}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+def latest_sequence():
+    return InterviewChange.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+async def alatest_sequence():
+    return (await InterviewChange.objects.aaggregate(latest=Max('id')))['latest'] or 0
+
+
+async def change_events(last_id=None, start_date=None, end_date=None, department=None):
+    """
+    Yield server-sent events for the changes after `last_id` that match the
+    filters, then for each new one as it commits, until the client leaves.
+    Without `last_id` the stream starts at the newest change. A `last_id`
+    older than the retained log gets a `reset` event: the client missed
+    changes and should reload before following the stream.
+    """
+    condition = _matching(start_date, end_date, department)
+    async with get_broker().subscribe() as published:
+        latest = await alatest_sequence()
+        if last_id is None:
+            last_id = latest
+        elif last_id < await apruned_through():
+            yield f'id: {latest}\nevent: reset\ndata: {{}}\n\n'
+            last_id = latest
+        yield f'retry: {settings.CHANGE_FEED_POLL_SECONDS * 1000}\n\n'
+
+        while True:
+            # Cleared before reading, so a publish during the read wakes the next wait
+            published.clear()
+            latest = await alatest_sequence()
+            while last_id < latest:
+                changes = [
+                    change async for change in InterviewChange.objects
+                    .filter(condition, id__gt=last_id, id__lte=latest)
+                    .order_by('id')[:settings.CHANGE_FEED_BATCH_SIZE]
+                ]
+                for change in changes:
+                    yield format_event(change)
+                if len(changes) < settings.CHANGE_FEED_BATCH_SIZE:
+                    last_id = latest
+                else:
+                    last_id = changes[-1].id
+            try:
+                await asyncio.wait_for(published.wait(), settings.CHANGE_FEED_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # A comment line keeps proxies from closing an idle stream
+                yield ': keep-alive\n\n'
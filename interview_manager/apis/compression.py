@@ -0,0 +1,137 @@
+"""
+Content-negotiated response compression.
+
+`CompressionMiddleware` compresses a response with the first encoding of
+COMPRESSION_ENCODINGS (zstd and brotli when their packages are installed,
+then gzip) among those the client's Accept-Encoding rates highest, once the
+body reaches COMPRESSION_MIN_BYTES; smaller ones gain less than the
+compressor costs. Streaming responses, such as exports, are compressed
+chunk by chunk and flushed after each, so a client receives rows as they
+are produced rather than when the stream ends.
+
+Left alone: responses that already have a Content-Encoding, event streams,
+whose small events must not wait in a compressor, and responses with a
+strong ETag (single interviews). A strong ETag names the exact bytes and is
+compared by If-Match, so compressing would have to weaken it.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+# Levels for dynamic responses: most of the size reduction for little CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+def _gzip():
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _brotli():
+    import brotli
+
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+def _zstd():
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), compressor.flush
+
+
+# Each factory returns a new compressor as (compress, flush, finish) functions
+CODECS = {'zstd': _zstd, 'br': _brotli, 'gzip': _gzip}
+
+
+def compress(data, encoding):
+    """`data` compressed in one piece with `encoding`."""
+    compress_chunk, _, finish = CODECS[encoding]()
+    return compress_chunk(data) + finish()
+
+
+def compress_stream(chunks, encoding):
+    compress_chunk, flush, finish = CODECS[encoding]()
+    for chunk in chunks:
+        data = compress_chunk(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    compress_chunk, flush, finish = CODECS[encoding]()
+    async for chunk in chunks:
+        data = compress_chunk(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def _qualities(accept_encoding):
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            qualities[coding.strip().lower()] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding, encodings):
+    """
+    The encoding of `encodings` the Accept-Encoding header rates highest,
+    earlier ones winning ties, or None when it accepts none of them.
+    """
+    qualities = _qualities(accept_encoding or '')
+    rated = [
+        (qualities.get(encoding, qualities.get('*', 0.0)), -position, encoding)
+        for position, encoding in enumerate(encodings)
+    ]
+    quality, _, encoding = max(rated, default=(0.0, 0, None))
+    return encoding if quality > 0 else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses as the module docstring describes."""
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if response.get('ETag', '').startswith('"'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+
+        # The body depends on Accept-Encoding from here on, compressed or not
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'), settings.COMPRESSION_ENCODINGS)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream = acompress_stream if response.is_async else compress_stream
+            response.streaming_content = stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        return response
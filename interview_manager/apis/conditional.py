@@ -0,0 +1,126 @@
+"""
+Conditional requests for interview listings and single interviews.
+
+A calendar listing's ETag is a digest of the view, its query string, the
+negotiated media type (JSON and MessagePack bodies differ) and validators
+that change whenever its rows can have:
+
+- for a view with a response cache (apis/cache.py), the cache versions of
+  the dates in its window, which every write bumps once it commits. They
+  come from the cache, so a warm listing is revalidated without a query.
+  While a replica read may predate the last bump, the aggregate below is
+  used instead.
+- otherwise the `(max(updated_at), count)` of its filtered queryset, one
+  aggregate query over its date window. Any insert or update moves the
+  newest `updated_at` and any delete changes the count. (Listings without a
+  window, such as all interviews, would pay a scan of the table and have no
+  ETag.)
+
+A matching If-None-Match gets a 304 before the rows are read or encoded.
+Listings send no Last-Modified: a delete leaves the newest `updated_at`
+where it was.
+
+A single interview's ETag is strong, built from its pk and `updated_at`, so
+it can also be sent back in If-Match: an update or delete whose If-Match no
+longer matches the stored row fails with 412 instead of overwriting a change
+the client has not seen. Its Last-Modified is `updated_at` in whole seconds,
+the precision of the HTTP date a client sends back.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .cache import WindowCacheMixin, replica_may_lag
+
+# Both covered by the (date, updated_at) index for a date-bounded listing
+VALIDATORS = {'newest': Max('updated_at'), 'rows': Count('*')}
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    The 304 or 412 response the request's conditional headers call for, as
+    a DRF Response carrying the validators, or None to carry on.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        return None
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return Response(status=response.status_code, headers=headers)
+
+
+def _collection_etag(view, validators):
+    raw = repr((
+        type(view).__name__, sorted(view.request.query_params.lists()), view.request.accepted_media_type,
+        sorted(validators.items()),
+    ))
+    return 'W/' + quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+class ConditionalListMixin:
+    """
+    ETag and If-None-Match for a list view; see the module docstring.
+    `conditional=False` skips both, for callers that never revalidate.
+    """
+
+    conditional = True
+
+    def cached_validators(self):
+        """The window's cache versions, or None to aggregate the rows instead."""
+        if not isinstance(self, WindowCacheMixin):
+            return None
+        _, versions = self.get_cache_key()
+        return None if replica_may_lag(versions) else {'versions': versions}
+
+    def list(self, request, *args, **kwargs):
+        if not self.conditional:
+            return super().list(request, *args, **kwargs)
+        validators = self.cached_validators()
+        if validators is None:
+            validators = self.filter_queryset(self.get_queryset()).order_by().aggregate(**VALIDATORS)
+        etag = _collection_etag(self, validators)
+        response = conditional_response(request, etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            response['ETag'] = etag
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.conditional:
+            return await super().alist(request, *args, **kwargs)
+        validators = None
+        if isinstance(self, WindowCacheMixin):
+            validators = await sync_to_async(self.cached_validators)()
+        if validators is None:
+            validators = await self.filter_queryset(self.get_queryset()).order_by().aaggregate(**VALIDATORS)
+        etag = _collection_etag(self, validators)
+        response = conditional_response(request, etag)
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+            response['ETag'] = etag
+        return response
+
+
+def interview_etag(interview):
+    return quote_etag(f'{interview.pk}-{interview.updated_at.timestamp():.6f}')
+
+
+def interview_last_modified(interview):
+    # HTTP dates have whole seconds; a fraction here would never compare
+    # equal to the If-Modified-Since / If-Unmodified-Since sent back
+    return int(interview.updated_at.timestamp())
+
+
+def interview_conditional_response(request, interview):
+    return conditional_response(request, interview_etag(interview), interview_last_modified(interview))
+
+
+def set_interview_validators(response, interview):
+    response['ETag'] = interview_etag(interview)
+    response['Last-Modified'] = http_date(interview_last_modified(interview))
+    return response
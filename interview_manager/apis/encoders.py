@@ -0,0 +1,170 @@
+"""
+Read-only fast path for interview list endpoints.
+
+A ModelSerializer builds a model instance per row and walks every bound
+field's `to_representation`. For plain listings that is mostly wasted work:
+the columns can be read as tuples with `values_list()` and each one passed
+through an encoder chosen once per field. The output is the same list of
+dicts `InterviewSerializer(many=True).data` produces, so the rendered JSON is
+byte-for-byte identical.
+"""
+import datetime
+from functools import lru_cache
+from itertools import repeat
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+from django.utils.duration import duration_string
+
+from .fields import requested_fields
+
+
+# Dates, times and durations repeat heavily across an interview listing (a
+# month has ~30 dates and a handful of slot lengths), so their string forms
+# are memoized. The bound keeps a pathological table from growing the cache.
+@lru_cache(maxsize=4096)
+def _iso_format(value):
+    return value.isoformat()
+
+
+def _iso_datetime(value):
+    # Not memoized: timestamps rarely repeat, so a cache would only add misses.
+    # DRF writes UTC as 'Z'.
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+_duration_string = lru_cache(maxsize=4096)(duration_string)
+
+
+def _is_iso(field, default):
+    output_format = getattr(field, 'format', default)
+    return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+
+def _column(encoder):
+    """Return a callable encoding a column's non-null values with `encoder`."""
+    def encode(values):
+        return [None if value is None else encoder(value) for value in values]
+    return encode
+
+
+def _datetime_column(values):
+    # Like DateTimeField, in the timezone current when the column is encoded.
+    # Database values already are UTC, the usual current timezone.
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    if tz is None or getattr(tz, 'key', None) == 'UTC' or tz is datetime.timezone.utc:
+        return [None if value is None else _iso_datetime(value) for value in values]
+    return [None if value is None else _iso_datetime(value.astimezone(tz)) for value in values]
+
+
+def _encoder_for(field):
+    """
+    Return a callable turning a column of database values into what
+    `field.to_representation` gives for each, or None when the values pass
+    through unchanged.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        if _is_iso(field, api_settings.DATETIME_FORMAT) and not hasattr(field, 'timezone'):
+            return _datetime_column
+        return _column(field.to_representation)
+    if isinstance(field, serializers.DateField) and _is_iso(field, api_settings.DATE_FORMAT):
+        return _column(_iso_format)
+    if isinstance(field, serializers.TimeField) and _is_iso(field, api_settings.TIME_FORMAT):
+        return _column(_iso_format)
+    if isinstance(field, serializers.DurationField):
+        return _column(_duration_string)
+    if isinstance(field, serializers.ChoiceField):
+        # Stored values are the choice keys, which represent as themselves
+        return None
+    if type(field) in (serializers.CharField, serializers.IntegerField):
+        # Database strings and integers already are their representation
+        return None
+    return _column(field.to_representation)
+
+
+class RowEncoder:
+    """
+    Encode `values_list(*encoder.columns)` rows into serializer output,
+    limited to `fields` when given (see apis/fields.py).
+
+    Rows are encoded a column at a time: the columns are transposed, each one
+    that needs it goes through its encoder in one list comprehension, and the
+    dicts are zipped back together, so most of the per-row work runs in C.
+    Columns after the serializer's (such as ordering columns) are ignored.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        fields = [
+            field for field in serializer_class().fields.values()
+            if not field.write_only and (fields is None or field.field_name in fields)
+        ]
+        self.names = tuple(field.field_name for field in fields)
+        self.columns = tuple(field.source for field in fields)
+        self.encoders = tuple(_encoder_for(field) for field in fields)
+
+    def encode(self, rows):
+        columns = [
+            values if encode is None else encode(values)
+            for encode, values in zip(self.encoders, zip(*rows))
+        ]
+        return list(map(dict, map(zip, repeat(self.names), zip(*columns))))
+
+
+@lru_cache(maxsize=256)
+def row_encoder_for(serializer_class, fields=None):
+    return RowEncoder(serializer_class, fields)
+
+
+class FastListMixin:
+    """
+    List through `RowEncoder` instead of the serializer. Only for views whose
+    serializer is a plain ModelSerializer over model columns.
+    """
+
+    def get_row_encoder(self):
+        serializer_class = self.get_serializer_class()
+        return row_encoder_for(serializer_class, requested_fields(self.request, serializer_class))
+
+    def get_rows(self):
+        encoder = self.get_row_encoder()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Named rows let the keyset paginator read the ordering columns by
+        # name, so they are read even when ?fields= leaves them out
+        ordering = getattr(self.pagination_class, 'ordering', ())
+        columns = encoder.columns + tuple(column for column in ordering if column not in encoder.columns)
+        return queryset.values_list(*columns, named=True)
+
+    def list(self, request, *args, **kwargs):
+        encoder = self.get_row_encoder()
+        rows = self.get_rows()
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(encoder.encode(page))
+        return Response(encoder.encode(rows))
+
+    async def apaginate_rows(self, rows):
+        """
+        `paginate_queryset()` for async views: the page is read with one
+        async query. Needs a KeysetPagination paginator.
+        """
+        if self.paginator is None:
+            return None
+        self.paginator.prepare(self.request, self)
+        if not self.paginator.page_size:
+            return None
+        return self.paginator.set_page([row async for row in self.paginator.get_page_queryset(rows)])
+
+    async def alist(self, request, *args, **kwargs):
+        encoder = self.get_row_encoder()
+        rows = self.get_rows()
+
+        page = await self.apaginate_rows(rows)
+        if page is not None:
+            return self.get_paginated_response(encoder.encode(page))
+        chunk_size = settings.INTERVIEW_LIST_CHUNK_SIZE
+        return Response(encoder.encode([row async for row in rows.aiterator(chunk_size=chunk_size)]))
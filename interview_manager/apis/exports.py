@@ -0,0 +1,105 @@
+"""
+Interview exports: rows encoded for the CSV and NDJSON renderers, and
+per-month snapshot files regenerated in the background (apis/tasks.py).
+
+A snapshot's name carries a digest of the calendar cache versions
+(apis/cache.py) of its month, read before its rows. A write bumps those
+versions after it commits, so a snapshot made before a write can never be
+served after it: the export view only opens the file named for the current
+versions and streams from the database when there is none.
+"""
+import hashlib
+import tempfile
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .cache import get_versions, window_dates
+from .encoders import row_encoder_for
+from .models import Interview
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import InterviewSerializer
+from .windows import month_window
+
+SNAPSHOT_RENDERERS = (NDJSONRenderer, CSVRenderer)
+
+
+def export_chunks(queryset, renderer, serializer_class=InterviewSerializer, fields=None):
+    """
+    Yield `queryset` rendered by `renderer`, INTERVIEW_EXPORT_CHUNK_SIZE rows
+    at a time, limited to `fields` when given.
+    """
+    encoder = row_encoder_for(serializer_class, fields)
+    rows = queryset.values_list(*encoder.columns).iterator(chunk_size=settings.INTERVIEW_EXPORT_CHUNK_SIZE)
+    if isinstance(renderer, CSVRenderer):
+        yield renderer.render_header(encoder.names)
+    while chunk := list(islice(rows, settings.INTERVIEW_EXPORT_CHUNK_SIZE)):
+        yield renderer.render_rows(encoder.encode(chunk))
+
+
+async def aexport_chunks(*args, **kwargs):
+    """
+    `export_chunks()` as an async iterator, for ASGI: Django reads a sync
+    iterator to the end before sending any of it. Each chunk is read and
+    rendered in the thread the database connection belongs to.
+    """
+    chunks = export_chunks(*args, **kwargs)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Releases the cursor when the client leaves early
+        await sync_to_async(chunks.close)()
+
+
+def month_queryset(year, month):
+    start_date, end_date = month_window(month, year)
+    return Interview.objects.filter(date__range=[start_date, end_date]).order_by('date', 'time', 'id')
+
+
+def _prefix(year, month):
+    return f'interviews-{year:04}-{month:02}-'
+
+
+def _snapshot_name(year, month, renderer):
+    versions = get_versions(window_dates(*month_window(month, year)))
+    digest = hashlib.sha1(repr(versions).encode()).hexdigest()[:16]
+    return f'{settings.INTERVIEW_EXPORT_SNAPSHOT_DIR}/{_prefix(year, month)}{digest}.{renderer.format}'
+
+
+def write_month_snapshots(year, month):
+    """Write the month in every snapshot format and drop its older snapshots."""
+    current = set()
+    for renderer_class in SNAPSHOT_RENDERERS:
+        renderer = renderer_class()
+        name = _snapshot_name(year, month, renderer)
+        current.add(name)
+        if default_storage.exists(name):
+            continue
+        with tempfile.TemporaryFile() as buffer:
+            for chunk in export_chunks(month_queryset(year, month), renderer):
+                buffer.write(chunk)
+            buffer.seek(0)
+            saved = default_storage.save(name, File(buffer))
+        if saved != name:
+            # Another run saved the same snapshot first
+            default_storage.delete(saved)
+
+    directory = settings.INTERVIEW_EXPORT_SNAPSHOT_DIR
+    if default_storage.exists(directory):
+        for filename in default_storage.listdir(directory)[1]:
+            name = f'{directory}/{filename}'
+            if filename.startswith(_prefix(year, month)) and name not in current:
+                default_storage.delete(name)
+
+
+def open_month_snapshot(year, month, renderer):
+    """The current snapshot of the month for `renderer`, or None."""
+    try:
+        return default_storage.open(_snapshot_name(year, month, renderer), 'rb')
+    except FileNotFoundError:
+        return None
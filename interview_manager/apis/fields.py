@@ -0,0 +1,47 @@
+"""
+Sparse fieldsets for interview responses.
+
+`?fields=` takes field names and presets, comma-separated (`?fields=calendar,role`).
+Interview listings then read only those columns (see encoders.RowEncoder),
+and interview responses render only those fields; `id` is always kept.
+Without the parameter, or with the `full` preset, every field is sent.
+"""
+from functools import lru_cache
+
+from rest_framework.exceptions import ValidationError
+
+PRESETS = {
+    # What the calendar grid draws
+    'calendar': ('id', 'interviewee', 'date', 'time', 'duration', 'department'),
+    'full': None,
+}
+
+
+@lru_cache(maxsize=None)
+def _readable_fields(serializer_class):
+    return tuple(name for name, field in serializer_class().fields.items() if not field.write_only)
+
+
+def parse_fields(value, serializer_class):
+    """
+    The fields named by a `fields` value, in the serializer's order, or None
+    for all of them. Raises a 400 ValidationError on an unknown name.
+    """
+    if not value:
+        return None
+    readable = _readable_fields(serializer_class)
+    wanted = {'id'}
+    for name in filter(None, (part.strip() for part in value.split(','))):
+        if name in PRESETS:
+            if PRESETS[name] is None:
+                return None
+            wanted.update(PRESETS[name])
+        elif name in readable:
+            wanted.add(name)
+        else:
+            raise ValidationError({"fields": f"Unknown field or preset: {name}."})
+    return tuple(name for name in readable if name in wanted)
+
+
+def requested_fields(request, serializer_class):
+    return parse_fields(request.query_params.get('fields'), serializer_class)
@@ -0,0 +1,26 @@
+"""
+Password hashers with their cost taken from settings.
+
+Django's PBKDF2 default (870,000 iterations) makes each login cost hundreds
+of milliseconds of CPU. Argon2id and scrypt are memory-hard, so they reach
+the same resistance to GPU cracking with far less CPU per hash. Hashes made
+with other parameters or hashers still verify, and are re-hashed with the
+preferred one on the user's next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST
+    parallelism = settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR
+    block_size = settings.PASSWORD_SCRYPT_BLOCK_SIZE
+    parallelism = settings.PASSWORD_SCRYPT_PARALLELISM
+    # hashlib refuses more than 32 MiB unless told otherwise
+    maxmem = 256 * work_factor * block_size
+
@@ -0,0 +1,154 @@
+"""
+Interval structures for interviewer double-booking checks.
+
+An interview occupies the half-open interval [date + time, + duration), so
+back-to-back slots do not conflict.
+"""
+import bisect
+import datetime
+import heapq
+from itertools import accumulate, groupby
+
+from .models import Interview
+
+# PostgreSQL exclusion constraint: two interviews of the same interviewer may
+# not overlap in time. The range is computed from date, time and duration, so
+# no column is stored.
+DOUBLE_BOOKING_CONSTRAINT = 'interview_no_double_booking'
+DOUBLE_BOOKING_CONSTRAINT_SQL = (
+    f'ALTER TABLE apis_interview ADD CONSTRAINT {DOUBLE_BOOKING_CONSTRAINT} '
+    'EXCLUDE USING gist ('
+    '    interviewer WITH =, '
+    '    tsrange(date + time, date + time + duration) WITH &&'
+    ") WHERE (interviewer IS NOT NULL AND interviewer <> '')"
+)
+
+
+def interview_span(date, time, duration):
+    start = datetime.datetime.combine(date, time)
+    return start, start + duration
+
+
+class IntervalIndex:
+    """
+    Intervals sorted by start, with a running maximum of their ends.
+
+    `overlapping()` finds the intervals starting before the query ends by
+    bisection, then walks backwards only while the running maximum says an
+    earlier interval can still reach the query start: O(log n + k) for k
+    hits, even when the stored intervals already overlap one another.
+
+    `add()` finds its position by bisection, but inserting into the lists
+    moves the entries after it, so it is O(n) in the worst case; the indexes
+    hold one interviewer's day, which keeps n small.
+    """
+
+    def __init__(self, intervals=()):
+        self._items = sorted(intervals, key=lambda item: item[0])
+        self._reindex()
+
+    def _reindex(self):
+        self._starts = [start for start, _, _ in self._items]
+        self._max_ends = list(accumulate((end for _, end, _ in self._items), max))
+
+    def add(self, start, end, key=None):
+        position = bisect.bisect_right(self._starts, start)
+        self._items.insert(position, (start, end, key))
+        self._starts.insert(position, start)
+        running = max(end, self._max_ends[position - 1]) if position else end
+        self._max_ends.insert(position, running)
+        # Later running maxima only change up to the first one already past `end`
+        for later in range(position + 1, len(self._max_ends)):
+            if self._max_ends[later] >= running:
+                break
+            self._max_ends[later] = running
+
+    def overlapping(self, start, end):
+        """Keys of stored intervals that intersect [start, end)."""
+        hits = []
+        position = bisect.bisect_left(self._starts, end) - 1
+        while position >= 0 and self._max_ends[position] > start:
+            item_start, item_end, key = self._items[position]
+            if item_end > start:
+                hits.append(key)
+            position -= 1
+        return hits
+
+    def __len__(self):
+        return len(self._items)
+
+
+class BookingIndex:
+    """
+    Per-interviewer, per-day IntervalIndexes loaded lazily from the database.
+
+    Shared across the rows of a batch so every (interviewer, day) is read
+    once and rows accepted earlier in the batch are checked too.
+    """
+
+    def __init__(self, queryset=None):
+        self.queryset = Interview.objects.all() if queryset is None else queryset
+        self._days = {}
+
+    def _load(self, interviewer, days):
+        """Read every not-yet-loaded day of `interviewer` in one query."""
+        missing = [day for day in days if (interviewer, day) not in self._days]
+        if not missing:
+            return
+        spans = {day: [] for day in missing}
+        rows = self.queryset.filter(interviewer=interviewer, date__in=missing).values_list(
+            'id', 'date', 'time', 'duration'
+        )
+        for pk, day, time, duration in rows:
+            spans[day].append((*interview_span(day, time, duration), pk))
+        for day, intervals in spans.items():
+            self._days[(interviewer, day)] = IntervalIndex(intervals)
+
+    def conflicts(self, interviewer, start, end, exclude=None):
+        """Ids of interviews booked for `interviewer` that overlap [start, end)."""
+        # An interview that started the day before may run past midnight
+        first = start.date() - datetime.timedelta(days=1)
+        days = [first + datetime.timedelta(days=n) for n in range((end.date() - first).days + 1)]
+        self._load(interviewer, days)
+
+        hits = []
+        for day in days:
+            hits += self._days[(interviewer, day)].overlapping(start, end)
+        return [pk for pk in hits if exclude is None or pk != exclude]
+
+    def add(self, interviewer, start, end, key=None):
+        self._load(interviewer, [start.date()])
+        self._days[(interviewer, start.date())].add(start, end, key)
+
+
+def find_conflicts(bookings):
+    """
+    Yield `(interviewer, first, second, overlap_start, overlap_end)` for every
+    overlapping pair in `bookings`, an iterable of
+    `(interviewer, start, end, key)` sorted by interviewer then start.
+
+    A sweep keeps a heap of the intervals still open at each start, so the
+    cost is O(n log n) plus the number of conflicts reported, rather than
+    comparing every pair.
+    """
+    for interviewer, group in groupby(bookings, key=lambda booking: booking[0]):
+        active = []
+        for _, start, end, key in group:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for other_end, other_start, other_key in active:
+                yield interviewer, other_key, key, start, min(end, other_end)
+            heapq.heappush(active, (end, start, key))
+
+
+def double_bookings(queryset):
+    """
+    `find_conflicts()` over the interviews in `queryset` that have an
+    interviewer.
+    """
+    rows = queryset.exclude(interviewer__isnull=True).exclude(interviewer='').order_by(
+        'interviewer', 'date', 'time', 'id'
+    ).values_list('interviewer', 'date', 'time', 'duration', 'id')
+    return find_conflicts(
+        (interviewer, *interview_span(date, time, duration), pk) for interviewer, date, time, duration, pk in rows
+    )
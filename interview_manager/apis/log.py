@@ -0,0 +1,128 @@
+"""
+Logging for the apis app: JSON lines, written off the request thread.
+
+Request code logs with an `event` name and any structured fields in
+`extra`. `EventFilter` samples or rate-limits chosen events before anything
+is queued, `QueueingHandler` hands the record to a background thread, and
+`JSONFormatter` serializes it there. Wired up in settings.LOGGING.
+"""
+import copy
+import datetime
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through `extra`
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class EventFilter(logging.Filter):
+    """
+    Per-event sampling and rate limiting.
+
+    `events` maps an event name to `{'sample': fraction}`, keeping that share
+    of its records, and/or `{'rate': n, 'per': seconds}`, a token bucket that
+    lets bursts of up to `n` through and then `n` per `per` seconds. Kept
+    records carry `sample_rate`; the first one after a suppressed stretch
+    carries the number dropped as `suppressed`. Records without a configured
+    event always pass.
+    """
+
+    def __init__(self, events=None):
+        super().__init__()
+        self.events = events or {}
+        self._buckets = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        policy = self.events.get(event)
+        if policy is None:
+            return True
+
+        sample = policy.get('sample', 1.0)
+        if sample < 1.0:
+            if random.random() >= sample:
+                return False
+            record.sample_rate = sample
+
+        if 'rate' in policy:
+            with self._lock:
+                if not self._take(event, policy['rate'], policy.get('per', 1.0)):
+                    self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                    return False
+                suppressed = self._suppressed.pop(event, 0)
+            if suppressed:
+                record.suppressed = suppressed
+        return True
+
+    def _take(self, event, rate, per):
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(event, (rate, now))
+        tokens = min(rate, tokens + (now - updated) * rate / per)
+        if tokens < 1:
+            self._buckets[event] = (tokens, now)
+            return False
+        self._buckets[event] = (tokens - 1, now)
+        return True
+
+
+class QueueingHandler(QueueHandler):
+    """
+    Queue records for a background thread that formats and writes them to
+    `stream` (stderr by default), so a slow log sink never blocks a request.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        target = logging.StreamHandler(stream or sys.stderr)
+        self._target = target
+        self.listener = QueueListener(self.queue, target, respect_handler_level=False)
+        self.listener.start()
+        self._listening = True
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        self._target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Freeze the parts of the record that could change after the call
+        returns; the rest is formatted on the listener thread.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self):
+        # logging.shutdown() closes every handler at exit, draining the queue
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+        super().close()
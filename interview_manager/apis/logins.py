@@ -0,0 +1,66 @@
+"""
+Deferred last_login writes.
+
+Writing last_login on every login turns a login storm into a storm of
+single-row UPDATEs competing for the same table. Logins are instead noted in
+memory (a repeat login only moves the timestamp) and written together by one
+bulk UPDATE at most LAST_LOGIN_FLUSH_SECONDS later, from a timer thread.
+Nothing is written at exit, when the database may already be gone: a process
+that stops loses at most one interval of timestamps.
+"""
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .models import User
+
+
+class LastLoginBuffer:
+    def __init__(self):
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, user, when):
+        """Note that `user` logged in at `when`."""
+        user.last_login = when
+        interval = settings.LAST_LOGIN_FLUSH_SECONDS
+        if not interval:
+            user.save(update_fields=['last_login'])
+            return
+        with self._lock:
+            self._pending[user.pk] = when
+            if self._timer is None:
+                self._timer = threading.Timer(interval, self._flush_in_thread)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write every pending timestamp now; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        users = [User(pk=pk, last_login=when) for pk, when in pending.items()]
+        User.objects.bulk_update(users, ['last_login'], batch_size=500)
+        return len(users)
+
+    def clear(self):
+        """Drop pending timestamps without writing them."""
+        with self._lock:
+            self._pending = {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's connection would otherwise never be closed
+            connection.close()
+
+
+last_logins = LastLoginBuffer()
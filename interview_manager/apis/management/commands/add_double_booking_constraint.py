@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from apis.intervals import DOUBLE_BOOKING_CONSTRAINT, DOUBLE_BOOKING_CONSTRAINT_SQL, double_bookings
+from apis.models import Interview
+
+
+class Command(BaseCommand):
+    help = (
+        'Add the PostgreSQL constraint against double-booked interviewers, which '
+        'migration 0019 skips while existing interviews overlap. Lists the overlaps '
+        'and fails if any remain.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('The double-booking constraint needs PostgreSQL.')
+
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM pg_constraint WHERE conname = %s', [DOUBLE_BOOKING_CONSTRAINT]
+            )
+            if cursor.fetchone():
+                self.stdout.write(f'{DOUBLE_BOOKING_CONSTRAINT} is already in place.')
+                return
+
+            # Block writes while checking, so no overlap slips in before the constraint
+            cursor.execute('LOCK TABLE apis_interview IN SHARE MODE')
+            conflicts = list(double_bookings(Interview.objects.using(connection.alias)))
+            if conflicts:
+                for interviewer, first, second, start, end in conflicts:
+                    self.stderr.write(
+                        f'{interviewer}: interviews {first} and {second} overlap '
+                        f'from {start:%Y-%m-%d %H:%M} to {end:%H:%M}'
+                    )
+                raise CommandError(f'{len(conflicts)} double bookings must be resolved first.')
+
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            cursor.execute(DOUBLE_BOOKING_CONSTRAINT_SQL)
+        self.stdout.write(self.style.SUCCESS(f'Added {DOUBLE_BOOKING_CONSTRAINT}.'))
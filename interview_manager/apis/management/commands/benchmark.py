@@ -0,0 +1,34 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules under apis.benchmarks; each provides add_arguments(parser) and
+# run(**options), which returns a JSON-serializable dict of results.
+BENCHMARKS = [
+    'asgi',
+    'compression',
+    'connections',
+    'fieldsets',
+    'log',
+    'login',
+    'routes',
+    'serialization',
+]
+
+
+class Command(BaseCommand):
+    help = 'Run one of the apis benchmarks and print its results as JSON.'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='benchmark', required=True)
+        for name in BENCHMARKS:
+            module = import_module(f'apis.benchmarks.{name}')
+            module.add_arguments(subparsers.add_parser(name, help=module.__doc__.strip().splitlines()[0]))
+
+    def handle(self, *args, **options):
+        module = import_module(f"apis.benchmarks.{options['benchmark']}")
+        results = module.run(**options)
+        self.stdout.write(json.dumps(results, indent=2))
+        if results.get('regressions'):
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(results['regressions']))
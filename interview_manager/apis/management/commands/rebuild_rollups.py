@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apis import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the interview rollup table from the interviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        buckets = rollups.rebuild(options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} rollup buckets.'))
@@ -0,0 +1,60 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apis import rollups
+from apis.benchmarks import BENCHMARK_PASSWORD, generate_interviews, generate_users
+from apis.models import Interview, User
+
+SCALES = {
+    'small': (10_000, 50_000),
+    'medium': (100_000, 50_000),
+    'large': (1_000_000, 50_000),
+}
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic interviews and users for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small',
+                            help='Preset interview / user counts (default: small, 10k / 50k).')
+        parser.add_argument('--interviews', type=int, help='Override the number of interviews.')
+        parser.add_argument('--users', type=int, help='Override the number of users.')
+        parser.add_argument('--days', type=int, default=365, help='Spread interviews over this many days.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete all interviews and previously seeded users first.')
+
+    def handle(self, *args, **options):
+        interviews, users = SCALES[options['scale']]
+        interviews = options['interviews'] if options['interviews'] is not None else interviews
+        users = options['users'] if options['users'] is not None else users
+        using = options['database']
+
+        if options['clear']:
+            Interview.objects.using(using).all().delete()
+            User.objects.using(using).filter(email__endswith='@bench.example.com').delete()
+
+        self.insert(User, generate_users(users, seed=options['seed']), users, options)
+        self.insert(Interview, generate_interviews(interviews, days=options['days'], seed=options['seed']),
+                    interviews, options)
+        rollups.rebuild(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {interviews} interviews and {users} users into {using!r}. '
+            f'Seeded users log in with {BENCHMARK_PASSWORD!r}.'
+        ))
+
+    def insert(self, model, objects, total, options):
+        # Plain bulk inserts send no signals: rollups are rebuilt afterwards,
+        # but cached calendar responses are not refreshed.
+        done = 0
+        while batch := list(islice(objects, options['batch_size'])):
+            with transaction.atomic(using=options['database']):
+                model.objects.using(options['database']).bulk_create(batch, ignore_conflicts=model is User)
+            done += len(batch)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{model.__name__}: {done}/{total}')
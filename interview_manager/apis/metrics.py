@@ -0,0 +1,129 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+Every worker process keeps its own registry; Prometheus scrapes each one and
+aggregates. Latency-like values are kept in log-linear histograms so any
+quantile can be read back at a bounded relative error without storing the
+samples.
+"""
+import threading
+from collections import Counter, defaultdict
+
+
+class Histogram:
+    """
+    HdrHistogram-style histogram of non-negative integers.
+
+    Values below 2 * SUB_BUCKETS are counted exactly. Above that, each power
+    of two is split into SUB_BUCKETS equal buckets, so a value is known to
+    within 1 / SUB_BUCKETS of itself (about 3%) and memory grows with the
+    number of magnitudes seen rather than the number of samples.
+    """
+    SUB_BITS = 5
+    SUB_BUCKETS = 1 << SUB_BITS
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def index_of(cls, value):
+        shift = max(value.bit_length() - cls.SUB_BITS - 1, 0)
+        return shift * cls.SUB_BUCKETS + (value >> shift)
+
+    @classmethod
+    def highest_equivalent(cls, index):
+        shift = max(index // cls.SUB_BUCKETS - 1, 0)
+        mantissa = index - shift * cls.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(int(value), 0)
+        self.counts[self.index_of(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        """The smallest bucket bound at or below which `fraction` of values fall."""
+        if not self.count:
+            return 0
+        rank = max(fraction * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.highest_equivalent(index), self.max)
+        return self.max
+
+
+# name: (help, unit divisor). Histograms are recorded in integer units
+# (microseconds, queries, bytes) and divided back when rendered.
+HISTOGRAMS = {
+    'apis_request_duration_seconds': ('Wall time spent handling a request.', 1e6),
+    'apis_db_queries': ('Database queries issued per request.', 1),
+    'apis_db_duration_seconds': ('Time spent in database queries per request.', 1e6),
+    'apis_render_duration_seconds': ('Time spent rendering the response body.', 1e6),
+    'apis_response_size_bytes': ('Size of the response body.', 1),
+}
+REQUESTS_TOTAL = 'apis_requests_total'
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{%s}' % ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def _scaled(value, divisor):
+    return str(value) if divisor == 1 else repr(value / divisor)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(Histogram)
+        self._requests = Counter()
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            self._histograms[(name, labels)].record(value)
+
+    def count_request(self, labels):
+        with self._lock:
+            self._requests[labels] += 1
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    def render(self):
+        """The registry in the Prometheus text exposition format, version 0.0.4."""
+        lines = []
+        with self._lock:
+            for name, (help_text, divisor) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} summary']
+                series = sorted(
+                    ((labels, h) for (metric, labels), h in self._histograms.items() if metric == name),
+                    key=lambda item: item[0],
+                )
+                for labels, histogram in series:
+                    for quantile in QUANTILES:
+                        value = _scaled(histogram.quantile(quantile), divisor)
+                        lines.append(f'{name}{_labels(labels + (("quantile", quantile),))} {value}')
+                    lines.append(f'{name}_sum{_labels(labels)} {_scaled(histogram.total, divisor)}')
+                    lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+            lines += [f'# HELP {REQUESTS_TOTAL} Requests handled.', f'# TYPE {REQUESTS_TOTAL} counter']
+            for labels, count in sorted(self._requests.items()):
+                lines.append(f'{REQUESTS_TOTAL}{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,170 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Stats of the request being handled. A context variable rather than a
+# per-request execute wrapper: connections belong to threads, and under ASGI
+# a sync view queries on a worker thread's connection, not the event loop's.
+# sync_to_async copies the context, so the stats follow the request there.
+_current_stats = ContextVar('apis_request_stats', default=None)
+
+
+class RequestStats:
+    """Database and render timings of one request, fed by `record_query`."""
+
+    def __init__(self, keep_sql):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.sql = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.sql is not None:
+                self.sql.append((elapsed, sql))
+
+    @contextmanager
+    def collecting(self):
+        token = _current_stats.set(self)
+        try:
+            yield
+        finally:
+            _current_stats.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries into the current request's stats."""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """`connection_created` receiver: wrap every connection once, in every thread."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, query count, database time, render time and response
+    size of every request under its route name (see apis/metrics.py).
+
+    Streaming responses do most of their work while being sent, so they are
+    recorded once their content has been consumed. Requests slower than
+    METRICS_SLOW_REQUEST_MS, other than event streams, are logged with their
+    SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = request._metrics = RequestStats(keep_sql=bool(settings.METRICS_SLOW_REQUEST_MS))
+        started = time.perf_counter()
+        with stats.collecting():
+            response = self.get_response(request)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats = request._metrics = RequestStats(keep_sql=bool(settings.METRICS_SLOW_REQUEST_MS))
+        started = time.perf_counter()
+        with stats.collecting():
+            response = await self.get_response(request)
+        return self._finish(request, response, stats, started)
+
+    def _finish(self, request, response, stats, started):
+        if response.streaming:
+            stream = self._astream if response.is_async else self._stream
+            response.streaming_content = stream(request, response, response.streaming_content, stats, started)
+        else:
+            self._record(request, response, stats, time.perf_counter() - started, len(response.content))
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs just before DRF renders the response; the callback just after
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics.render_time += time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _stream(self, request, response, content, stats, started):
+        size = 0
+        content = iter(content)
+        try:
+            while True:
+                chunk_started = time.perf_counter()
+                with stats.collecting():
+                    chunk = next(content, None)
+                if chunk is None:
+                    break
+                stats.render_time += time.perf_counter() - chunk_started
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, stats, time.perf_counter() - started, size)
+
+    async def _astream(self, request, response, content, stats, started):
+        size = 0
+        content = aiter(content)
+        try:
+            while True:
+                with stats.collecting():
+                    chunk = await anext(content, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, stats, time.perf_counter() - started, size)
+
+    def _record(self, request, response, stats, elapsed, size):
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unmatched'
+        labels = (('route', route),)
+
+        registry.count_request(labels + (('method', request.method), ('status', response.status_code)))
+        registry.observe('apis_request_duration_seconds', labels, elapsed * 1e6)
+        registry.observe('apis_db_queries', labels, stats.queries)
+        registry.observe('apis_db_duration_seconds', labels, stats.db_time * 1e6)
+        registry.observe('apis_render_duration_seconds', labels, stats.render_time * 1e6)
+        registry.observe('apis_response_size_bytes', labels, size)
+
+        slow_ms = settings.METRICS_SLOW_REQUEST_MS
+        # An event stream lasts as long as its client stays; that is not slowness
+        event_stream = response.get('Content-Type', '').startswith('text/event-stream')
+        if slow_ms and elapsed * 1000 >= slow_ms and not event_stream:
+            logger.warning('Slow request %s %s', request.method, request.get_full_path(), extra={
+                'event': 'request.slow',
+                'route': route,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 1),
+                'queries': stats.queries,
+                'db_ms': round(stats.db_time * 1000, 1),
+                'sql': [{'ms': round(duration * 1000, 1), 'sql': sql} for duration, sql in stats.sql or ()],
+            })
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0016_user_phone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['date', 'time', 'id'], name='interview_date_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['date', 'id'], name='interview_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['department', 'id'], name='interview_department_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['department', 'date'], name='interview_department_date_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:48
+
+import datetime
+import sys
+from itertools import islice
+
+from django.core.management.color import color_style
+from django.db import migrations, models
+
+# Overlaps listed when existing bookings keep the constraint from being added
+REPORTED_CONFLICTS = 20
+
+# A copy of apis.intervals.DOUBLE_BOOKING_CONSTRAINT_SQL as of this migration
+DOUBLE_BOOKING_CONSTRAINT_SQL = (
+    'ALTER TABLE apis_interview ADD CONSTRAINT interview_no_double_booking '
+    'EXCLUDE USING gist ('
+    '    interviewer WITH =, '
+    '    tsrange(date + time, date + time + duration) WITH &&'
+    ") WHERE (interviewer IS NOT NULL AND interviewer <> '')"
+)
+
+
+def find_double_bookings(Interview, using):
+    """
+    Yield (interviewer, first id, second id, start) for overlapping bookings:
+    each booking that starts before the latest-ending earlier booking of its
+    interviewer ends, paired with that booking.
+    """
+    rows = Interview.objects.using(using).exclude(interviewer__isnull=True).exclude(interviewer='').order_by(
+        'interviewer', 'date', 'time', 'id'
+    ).values_list('interviewer', 'date', 'time', 'duration', 'id')
+    current = latest_end = latest_id = None
+    for interviewer, date, time, duration, pk in rows.iterator():
+        start = datetime.datetime.combine(date, time)
+        end = start + duration
+        if interviewer == current and start < latest_end:
+            yield interviewer, latest_id, pk, start
+        if interviewer != current or end > latest_end:
+            current, latest_end, latest_id = interviewer, end, pk
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # An exclusion constraint cannot be added NOT VALID, so existing overlaps
+    # would fail the migration. Report them and leave the constraint to
+    # `manage.py add_double_booking_constraint` once they are resolved.
+    Interview = apps.get_model('apis', 'Interview')
+    conflicts = list(islice(
+        find_double_bookings(Interview, schema_editor.connection.alias), REPORTED_CONFLICTS + 1
+    ))
+    if conflicts:
+        lines = [
+            f'  {interviewer}: interviews {first} and {second} overlap from {start:%Y-%m-%d %H:%M}'
+            for interviewer, first, second, start in conflicts[:REPORTED_CONFLICTS]
+        ]
+        if len(conflicts) > REPORTED_CONFLICTS:
+            lines.append('  ...')
+        sys.stdout.write(color_style().WARNING(
+            'Interviewers are double-booked, so the interview_no_double_booking constraint was not added:\n'
+            + '\n'.join(lines) + '\n'
+            'Reschedule these interviews, then run `manage.py add_double_booking_constraint`.\n'
+        ))
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(DOUBLE_BOOKING_CONSTRAINT_SQL)
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE apis_interview DROP CONSTRAINT IF EXISTS interview_no_double_booking')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0018_user_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['interviewer', 'date'], name='interview_interviewer_date_idx'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
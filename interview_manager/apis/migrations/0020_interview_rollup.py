@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:08
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_rollups(apps, schema_editor):
+    Interview = apps.get_model('apis', 'Interview')
+    InterviewRollup = apps.get_model('apis', 'InterviewRollup')
+    using = schema_editor.connection.alias
+    buckets = (
+        Interview.objects.using(using).order_by().values('date', 'department', 'role')
+        .annotate(interviews=Count('id'), duration=Sum('duration'))
+    )
+    InterviewRollup.objects.using(using).bulk_create(
+        (
+            InterviewRollup(
+                date=bucket['date'], department=bucket['department'], role=bucket['role'],
+                count=bucket['interviews'], total_duration=bucket['duration'],
+            )
+            for bucket in buckets.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0019_interview_double_booking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(choices=[('Software', 'Software'), ('Testing', 'Testing'), ('Cyber-Security', 'Cyber-Security'), ('Finance', 'Finance')], max_length=50)),
+                ('role', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('total_duration', models.DurationField(default=datetime.timedelta)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'department', 'role'), name='interview_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
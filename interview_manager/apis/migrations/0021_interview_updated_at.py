@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0020_interview_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['date', 'updated_at'], name='interview_date_updated_idx'),
+        ),
+    ]
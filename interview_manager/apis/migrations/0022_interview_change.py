@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0021_interview_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('interview_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('date', models.DateField()),
+                ('department', models.CharField(choices=[('Software', 'Software'), ('Testing', 'Testing'), ('Cyber-Security', 'Cyber-Security'), ('Finance', 'Finance')], max_length=50)),
+                ('previous_date', models.DateField(blank=True, null=True)),
+                ('previous_department', models.CharField(blank=True, choices=[('Software', 'Software'), ('Testing', 'Testing'), ('Cyber-Security', 'Cyber-Security'), ('Finance', 'Finance')], max_length=50, null=True)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='interview_change_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0022_interview_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewChangeWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_through', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
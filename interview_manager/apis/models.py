@@ -1,5 +1,9 @@
+import datetime
+
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, Lower
 
 # Choices for department and role
 Department_Choice = (
@@ -26,6 +30,14 @@ class User(AbstractBaseUser):
     department = models.CharField(max_length=20, choices=Department_Choice)
     role = models.CharField(max_length=50)
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # Lower-cased haystack for search_users, indexed by apis/search.py
+    search_text = models.GeneratedField(
+        expression=Lower(Concat(
+            'first_name', Value(' '), 'last_name', Value(' '), 'email', Value(' '), Coalesce('phone', Value('')),
+        )),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
@@ -51,6 +63,29 @@ class Interview(models.Model):
     business_area = models.CharField(max_length=100)
     department = models.CharField(max_length=50, choices=Department_Choice)
     additional_notes = models.TextField(blank=True, null=True)
+    # Set on every save and bulk insert, for ETags (see apis/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Calendar listings, keyset pages and the admin's (date, time) ordering
+            models.Index(fields=['date', 'time', 'id'], name='interview_date_time_id_idx'),
+            # Single-date and week lookups ordered by id
+            models.Index(fields=['date', 'id'], name='interview_date_id_idx'),
+            # ETags of calendar listings: max(updated_at) and count(*) per window
+            models.Index(fields=['date', 'updated_at'], name='interview_date_updated_idx'),
+            models.Index(fields=['department', 'id'], name='interview_department_id_idx'),
+            models.Index(fields=['department', 'date'], name='interview_department_date_idx'),
+            # Double-booking checks and the conflicts report
+            models.Index(fields=['interviewer', 'date'], name='interview_interviewer_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signal handlers can tell what a save moved
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return f"{self.interviewee} - {self.id}"
@@ -59,4 +94,68 @@ class Roles(models.Model):
     job_title = models.CharField(max_length=50)
 
     def __str__(self):
-        return self.job_title
\ No newline at end of file
+        return self.job_title
+
+
+class InterviewRollup(models.Model):
+    """
+    Number and total duration of the interviews on one day for one
+    department and role, kept current by apis/rollups.py.
+    """
+    date = models.DateField()
+    department = models.CharField(max_length=50, choices=Department_Choice)
+    role = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    total_duration = models.DurationField(default=datetime.timedelta)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'department', 'role'], name='interview_rollup_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.department} {self.role}: {self.count}"
+
+
+class InterviewChange(models.Model):
+    """
+    One create, update or delete of an interview, in commit order (see
+    apis/changes.py). `previous_date` and `previous_department` hold where
+    an updated interview was before, so a subscriber watching either side of
+    a move hears about it. `data` is the interview as the API renders it,
+    null for a delete.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [(CREATED, 'Created'), (UPDATED, 'Updated'), (DELETED, 'Deleted')]
+
+    id = models.BigAutoField(primary_key=True)
+    interview_id = models.IntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    date = models.DateField()
+    department = models.CharField(max_length=50, choices=Department_Choice)
+    previous_date = models.DateField(null=True, blank=True)
+    previous_department = models.CharField(max_length=50, choices=Department_Choice, null=True, blank=True)
+    data = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='interview_change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} interview {self.interview_id}"
+
+
+class InterviewChangeWatermark(models.Model):
+    """
+    The sequence number through which the change log has been pruned; a
+    single row, absent until the first prune. A client that last saw an
+    earlier change has missed some (see apis/changes.py).
+    """
+    pruned_through = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Pruned through #{self.pruned_through}"
@@ -0,0 +1,127 @@
+import json
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the full, unique ordering key.
+
+    DRF's CursorPagination seeks on the first ordering field only and skips
+    rows sharing that value with an OFFSET. Here the cursor carries every
+    ordering column, so each page is a single index range read and page 1000
+    costs the same as page 1.
+    """
+    ordering = ('id',)
+    page_size = settings.INTERVIEW_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.INTERVIEW_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prepare(request, view)
+        if not self.page_size:
+            return None
+        return self.set_page(list(self.get_page_queryset(queryset)))
+
+    def prepare(self, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, None, view)
+        self.cursor = self.decode_cursor(request)
+
+    def get_page_queryset(self, queryset):
+        """
+        Return the queryset for the requested page, fetching one extra row
+        to find out whether another page follows.
+        """
+        if self.cursor is not None and self.cursor.position is not None:
+            try:
+                queryset = queryset.filter(self.seek(self.cursor.position, self.cursor.reverse))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        if self.cursor is not None and self.cursor.reverse:
+            queryset = queryset.order_by(*['-' + field for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_following = len(results) > self.page_size
+        self.page = list(results[:self.page_size])
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None and self.cursor.position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def seek(self, position, reverse):
+        """
+        Build `(a, b, c) > (x, y, z)` as OR-ed equality prefixes, plus a plain
+        range bound on the leading column so the planner can use the index.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            clause = {prior: value for prior, value in zip(self.ordering[:i], position[:i])}
+            clause[f'{field}__{lookup}'] = position[i]
+            clauses.append(Q(**clause))
+        leading = Q(**{f'{self.ordering[0]}__{lookup}e': position[0]})
+        return leading & reduce(lambda a, b: a | b, clauses)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list) or len(position) != len(self.ordering)
+                or not all(isinstance(value, str) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing precedes the cursor, so the next page is the first one
+            return self.encode_cursor(Cursor(offset=0, reverse=False, position=None))
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            position = json.dumps(self.cursor.position)
+        else:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            values = [instance[field] for field in ordering]
+        else:
+            values = [getattr(instance, field) for field in ordering]
+        return json.dumps([str(value) for value in values])
+
+
+class CalendarKeysetPagination(KeysetPagination):
+    """Keyset pagination in calendar order, for date-bounded listings."""
+    ordering = ('date', 'time', 'id')
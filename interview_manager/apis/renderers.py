@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def dumps(item):
+    # Same separators and escaping as DRF's JSONRenderer
+    return json.dumps(item, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+class NDJSONRenderer(BaseRenderer):
+    """One compact JSON document per line; a dict renders as a single line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render_rows(self, rows):
+        return ''.join(dumps(row) + '\n' for row in rows).encode(self.charset)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return self.render_rows(data if isinstance(data, list) else [data])
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders a list of flat dicts as CSV with a header row taken from the
+    first item's keys; None becomes an empty cell.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render_header(self, names):
+        return self._write([names])
+
+    def render_rows(self, rows):
+        return self._write(['' if value is None else value for value in row.values()] for row in rows)
+
+    def _write(self, lines):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(lines)
+        return buffer.getvalue().encode(self.charset)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return b''
+        return self.render_header(list(rows[0])) + self.render_rows(rows)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack: the same data as the JSON responses, smaller and cheaper
+    to parse. Needs the msgpack package (see settings.INTERVIEW_MSGPACK).
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        # Anything MessagePack has no type for is converted as for JSON
+        return msgpack.packb(data, default=JSONEncoder().default)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Passes through text already in the Prometheus exposition format."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data.encode(self.charset)
@@ -0,0 +1,80 @@
+"""
+Interview counts per day, department and role, for dashboard statistics.
+
+After a write commits, `refresh()` recomputes every bucket of the dates it
+touched from the interview table (apis/tasks.py runs it in the background).
+Recomputing rather than adding deltas makes a refresh safe to repeat or run
+out of order: whichever run finishes last wrote what the table holds now.
+`rebuild()` recomputes the table from scratch.
+"""
+import datetime
+import zlib
+
+from django.db import connections, transaction
+from django.db.models import Count, Sum
+
+from .models import Interview, InterviewRollup
+
+BUCKET_FIELDS = ('date', 'department', 'role')
+
+
+def _date_lock_id(date):
+    # Advisory lock keys are bigints; keep every rollup lock in one namespace
+    return (zlib.crc32(b'interview_rollup') << 31) | date.toordinal()
+
+
+def refresh(dates, using='default'):
+    """Recompute the buckets of `dates`; returns how many hold interviews."""
+    dates = sorted({datetime.date.fromisoformat(str(date)) for date in dates})
+    if not dates:
+        return 0
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            # Two refreshes of one date take turns, so the later one reads
+            # every write the earlier one could have missed
+            with connection.cursor() as cursor:
+                for date in dates:
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [_date_lock_id(date)])
+        buckets = list(
+            Interview.objects.using(using).filter(date__in=dates).order_by().values(*BUCKET_FIELDS)
+            .annotate(interviews=Count('id'), duration=Sum('duration'))
+        )
+        InterviewRollup.objects.using(using).filter(date__in=dates).delete()
+        InterviewRollup.objects.using(using).bulk_create(
+            [
+                InterviewRollup(
+                    date=bucket['date'], department=bucket['department'], role=bucket['role'],
+                    count=bucket['interviews'], total_duration=bucket['duration'],
+                )
+                for bucket in buckets
+            ],
+            batch_size=1000,
+        )
+    return len(buckets)
+
+
+def rebuild(using='default'):
+    """Recompute every bucket from the interview table; returns the bucket count."""
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            # Hold off interview writes so none lands between the read and the insert
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Interview._meta.db_table)} IN SHARE MODE')
+        InterviewRollup.objects.using(using).all().delete()
+        buckets = (
+            Interview.objects.using(using).order_by().values(*BUCKET_FIELDS)
+            .annotate(interviews=Count('id'), duration=Sum('duration'))
+        )
+        InterviewRollup.objects.using(using).bulk_create(
+            (
+                InterviewRollup(
+                    date=bucket['date'], department=bucket['department'], role=bucket['role'],
+                    count=bucket['interviews'], total_duration=bucket['duration'],
+                )
+                for bucket in buckets.iterator()
+            ),
+            batch_size=1000,
+        )
+    return InterviewRollup.objects.using(using).count()
@@ -0,0 +1,152 @@
+"""
+Read-replica routing.
+
+When a `replica` database is configured, the read-only list views send
+their queries to it (`ReplicaReadMixin`, `replica_reads`); everything else,
+and every write, uses `default`. A replica lags the primary, so a client
+that has just written is pinned to the primary for
+DATABASE_PRIMARY_PIN_SECONDS and reads its own writes: by a cookie, and by
+user id in the cache for authenticated clients that drop cookies.
+`PrimaryPinMiddleware` sets both after every successful unsafe request,
+except to views marked with `primary_pin_exempt` because they only read.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+REPLICA = 'replica'
+PIN_COOKIE = 'primary_until'
+PIN_KEY = 'db:primary:{}'
+
+# The alias reads of the current request go to, or None for the default
+_read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+def reading_from_replica():
+    return _read_alias.get() == REPLICA
+
+
+def _user_id(request):
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def is_pinned(request):
+    """Whether `request` comes from a client that wrote too recently to read a replica."""
+    try:
+        if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user_id = _user_id(request)
+    return user_id is not None and cache.get(PIN_KEY.format(user_id)) is not None
+
+
+def replica_configured():
+    if REPLICA not in settings.DATABASES:
+        return False
+    # The test runner points a mirrored replica at default's settings but
+    # opens a second connection, which cannot see a TestCase's rows
+    return connections[REPLICA].settings_dict is not connections['default'].settings_dict
+
+
+def use_replica(request):
+    """
+    Send this context's reads to the replica, unless there is none or the
+    client is pinned; returns the token to reset it with.
+    """
+    alias = REPLICA if replica_configured() and not is_pinned(request) else None
+    return _read_alias.set(alias)
+
+
+@contextmanager
+def replica_context(request):
+    token = use_replica(request)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_reads(view):
+    """Decorator for a function view run by @api_view, after authentication."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_context(request):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """
+    Read from the replica between authentication (so a pinned user is known)
+    and `finalize_response`, for DRF views that only read.
+    """
+
+    _read_alias_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._read_alias_token = use_replica(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        self._stop_replica_reads()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # A worker thread serves the next request in the same context
+            self._stop_replica_reads()
+
+    def _stop_replica_reads(self):
+        if self._read_alias_token is not None:
+            _read_alias.reset(self._read_alias_token)
+            self._read_alias_token = None
+
+
+def primary_pin_exempt(view):
+    """Mark a view that only reads, though called with POST, as not pinning its client."""
+    view.primary_pin_exempt = True
+    return view
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """Pin a client to the primary after a successful POST, PUT, PATCH or DELETE."""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._primary_pin_exempt = getattr(view_func, 'primary_pin_exempt', False)
+
+    def process_response(self, request, response):
+        if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+            return response
+        if getattr(request, '_primary_pin_exempt', False):
+            return response
+        seconds = settings.DATABASE_PRIMARY_PIN_SECONDS
+        if replica_configured() and seconds:
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds, httponly=True, samesite='Lax',
+            )
+            user_id = _user_id(request)
+            if user_id is not None:
+                cache.set(PIN_KEY.format(user_id), True, seconds)
+        return response
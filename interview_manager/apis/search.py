@@ -0,0 +1,131 @@
+"""
+Ranked user search for the `search_users` typeahead.
+
+Every backend matches the query as a substring of `User.search_text` and
+returns at most `limit` rows, best match first:
+
+* PostgreSQL: a pg_trgm GIN index on `search_text` serves the LIKE filter,
+  and rows are ranked by trigram word similarity.
+* SQLite: an external-content FTS5 table with the trigram tokenizer, kept in
+  sync by triggers and ranked by bm25.
+* Anything else, and queries shorter than one trigram: a bounded LIKE scan
+  in id order.
+"""
+from django.db import DatabaseError, connections
+from django.db.models import F
+
+from .models import User
+
+FTS_TABLE = 'apis_user_search'
+RESULT_FIELDS = ('id', 'first_name', 'last_name', 'email')
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        search_text, content='apis_user', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON apis_user BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON apis_user BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF first_name, last_name, email, phone ON apis_user BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+]
+
+
+def install_search_index(using='default', **kwargs):
+    """
+    post_migrate hook that (re)creates the SQLite FTS table and triggers.
+
+    SQLite migrations rebuild apis_user from scratch whenever a column
+    changes, which silently drops its triggers, so this runs after every
+    migrate rather than once in a migration. The PostgreSQL trigram index is
+    an ordinary index and lives in migration 0018.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'apis_user' "
+            "AND name LIKE %s", [f'{FTS_TABLE}_%'],
+        )
+        if cursor.fetchone()[0] == 3:
+            return
+        try:
+            for statement in SQLITE_FTS_SQL:
+                cursor.execute(statement)
+        except DatabaseError:
+            # SQLite built without FTS5 or the trigram tokenizer (< 3.34)
+            return
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class ContainsSearchBackend:
+    """Unranked substring match; correct everywhere, fast nowhere."""
+    min_query_length = 1
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def search(self, query, limit, offset=0):
+        users = User.objects.using(self.connection.alias).filter(search_text__contains=query)
+        return list(users.order_by('id').values(*RESULT_FIELDS)[offset:offset + limit])
+
+
+class PostgresTrigramSearchBackend(ContainsSearchBackend):
+    min_query_length = 3
+
+    def search(self, query, limit, offset=0):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        users = (
+            User.objects.using(self.connection.alias)
+            .filter(search_text__contains=query)
+            .annotate(rank=TrigramWordSimilarity(query, 'search_text'))
+            .order_by(F('rank').desc(), 'id')
+        )
+        return list(users.values(*RESULT_FIELDS)[offset:offset + limit])
+
+
+class SQLiteFTSSearchBackend(ContainsSearchBackend):
+    min_query_length = 3
+
+    def search(self, query, limit, offset=0):
+        # A quoted FTS5 string is matched as a substring by the trigram tokenizer
+        match = '"%s"' % query.replace('"', '""')
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT u.id, u.first_name, u.last_name, u.email "
+                f"FROM {FTS_TABLE} JOIN apis_user u ON u.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}), u.id LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            return [dict(zip(RESULT_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def _sqlite_has_fts(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def search_users(query, limit, offset=0, using='default'):
+    """Return up to `limit` users matching `query`, best match first."""
+    connection = connections[using]
+    query = query.lower()
+
+    backend = ContainsSearchBackend
+    if connection.vendor == 'postgresql':
+        backend = PostgresTrigramSearchBackend
+    elif connection.vendor == 'sqlite' and _sqlite_has_fts(connection):
+        backend = SQLiteFTSSearchBackend
+
+    if len(query) < backend.min_query_length:
+        backend = ContainsSearchBackend
+    return backend(connection).search(query, limit, offset)
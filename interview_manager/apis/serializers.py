@@ -4,6 +4,15 @@ from django.contrib.auth.password_validation import validate_password
 from .models import User, Interview, Roles
 from django.core.validators import EmailValidator
 from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from collections.abc import Mapping
+import logging
+from contextlib import contextmanager
+from .intervals import DOUBLE_BOOKING_CONSTRAINT, BookingIndex, interview_span
+from . import signals
+
+logger = logging.getLogger(__name__)
 
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -19,18 +28,22 @@ class LoginSerializer(serializers.Serializer):
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
-            print(f"Email '{email}' does not exist in the database.")
+            logger.warning("Login failed: unknown email", extra={
+                'event': 'login.failed', 'reason': 'unknown_email', 'email': email,
+            })
             raise serializers.ValidationError({
                 "error": "Invalid email or password. Please try again."
             })
 
         if not user.check_password(password):
-            print(f"Password mismatch for user '{email}'.")
+            logger.warning("Login failed: wrong password", extra={
+                'event': 'login.failed', 'reason': 'wrong_password', 'email': email,
+            })
             raise serializers.ValidationError({
                 "error": "Invalid email or password. Please try again."
             })
 
-        print(f"Login successful for user '{email}'.")
+        logger.info("Login succeeded", extra={'event': 'login.succeeded', 'user_id': user.pk, 'email': email})
         data['user'] = user
         return data
 
@@ -69,16 +82,76 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-    
+
+@contextmanager
+def double_booking_guard():
+    """Turn a double-booking constraint violation into a validation error."""
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        if DOUBLE_BOOKING_CONSTRAINT not in str(exc):
+            raise
+        raise serializers.ValidationError({
+            "interviewer": "The interviewer is already booked at this time."
+        })
+
+
+class InterviewListSerializer(serializers.ListSerializer):
+    """
+    Validates and inserts a batch of interviews.
+
+    Invalid rows are collected in `row_errors` and skipped, unless the
+    `all_or_nothing` context flag is set, in which case any invalid row fails
+    the whole batch. Valid rows are inserted with `bulk_create` in chunks of
+    INTERVIEW_BULK_BATCH_SIZE inside a single transaction.
+    """
+    row_errors = ()
+
+    def to_internal_value(self, data):
+        self.row_errors = []
+        self._row = 0
+        # One booking index for the batch, so rows are checked against each other
+        self.context['booking_index'] = BookingIndex()
+        rows = [row for row in super().to_internal_value(data) if row is not None]
+        if self.row_errors and (self.context.get('all_or_nothing') or not rows):
+            raise serializers.ValidationError(self.row_errors)
+        return rows
+
+    def run_child_validation(self, data):
+        row, self._row = self._row, self._row + 1
+        try:
+            return super().run_child_validation(data)
+        except serializers.ValidationError as exc:
+            self.row_errors.append({"row": row, "errors": exc.detail})
+            return None
+
+    def create(self, validated_data):
+        interviews = [Interview(**attrs) for attrs in validated_data]
+        with double_booking_guard():
+            Interview.objects.bulk_create(interviews, batch_size=settings.INTERVIEW_BULK_BATCH_SIZE)
+            # bulk_create skips post_save, so queue its side effects directly
+            signals.interviews_bulk_created.send(sender=Interview, instances=interviews, using='default')
+        return interviews
+
+
 class InterviewSerializer(serializers.ModelSerializer):
     phone = serializers.CharField()
 
     class Meta:
         model = Interview
         fields = "__all__"
+        list_serializer_class = InterviewListSerializer
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # `fields` limits the output to a sparse fieldset (see apis/fields.py)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def to_internal_value(self, data):
-        phone = data.get('phone')
+        phone = data.get('phone') if isinstance(data, Mapping) else None
 
         if isinstance(phone, int):
             raise serializers.ValidationError({
@@ -87,6 +160,38 @@ class InterviewSerializer(serializers.ModelSerializer):
 
         return super().to_internal_value(data)
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        self.check_double_booking(attrs)
+        return attrs
+
+    def check_double_booking(self, attrs):
+        def current(name):
+            return attrs[name] if name in attrs else getattr(self.instance, name, None)
+
+        interviewer = current('interviewer')
+        if not interviewer:
+            return
+
+        start, end = interview_span(current('date'), current('time'), current('duration'))
+        bookings = self.context.get('booking_index') or BookingIndex()
+        conflicts = bookings.conflicts(interviewer, start, end, exclude=getattr(self.instance, 'pk', None))
+        if conflicts:
+            booked = [str(pk) for pk in conflicts if pk is not None]
+            where = f"interview {', '.join(booked)}" if booked else "another row of this batch"
+            raise serializers.ValidationError({
+                "interviewer": f"{interviewer} is already booked at this time ({where})."
+            })
+        bookings.add(interviewer, start, end)
+
+    def create(self, validated_data):
+        with double_booking_guard():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with double_booking_guard():
+            return super().update(instance, validated_data)
+
     def validate_phone(self, value):
         if not value.isdigit():
             raise serializers.ValidationError("Phone number must contain only numeric digits.")
@@ -104,6 +209,26 @@ class InterviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Enter a valid email address.")
         return value
     
+class BatchQuerySerializer(serializers.Serializer):
+    endpoint = serializers.CharField()
+    params = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+
+
+class BatchSerializer(serializers.Serializer):
+    interviews = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list,
+        max_length=settings.INTERVIEW_MAX_PAGE_SIZE,
+    )
+    queries = serializers.DictField(child=BatchQuerySerializer(), required=False, default=dict)
+    # Sparse fieldset of the `interviews` rows, as in ?fields=
+    fields = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_queries(self, value):
+        if len(value) > settings.BATCH_MAX_QUERIES:
+            raise serializers.ValidationError(f"At most {settings.BATCH_MAX_QUERIES} queries per batch.")
+        return value
+
+
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Roles
@@ -0,0 +1,121 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils.duration import duration_string
+
+from . import changes, tasks
+from .authentication import denylist
+from .models import Interview, InterviewChange, User
+
+# Sent with `instances` right after interviews are inserted with bulk_create,
+# which bypasses post_save, inside the inserting transaction.
+interviews_bulk_created = Signal()
+
+# What a candidate is told about; a save that changes none of it sends nothing
+NOTIFIED_FIELDS = ('interviewee', 'email', 'date', 'time', 'duration', 'interviewer', 'job_title')
+
+# What a save needs to know it had before: notified fields, plus where the
+# interview was for the change feed
+TRACKED_FIELDS = NOTIFIED_FIELDS + ('department',)
+
+
+def _loaded(instance):
+    return getattr(instance, '_loaded_values', None) or {}
+
+
+def _touched_dates(instance):
+    """The interview's date, plus the one it was loaded with if it moved."""
+    dates = {instance.date}
+    if 'date' in _loaded(instance):
+        dates.add(_loaded(instance)['date'])
+    return sorted({_format(Interview._meta.get_field('date').to_python(date)) for date in dates})
+
+
+def _enqueue(signature, using):
+    # Queued only once the write is committed; a broker outage is logged
+    # rather than failing a request whose write already succeeded
+    transaction.on_commit(signature.delay, using=using, robust=True)
+
+
+def _format(value):
+    if isinstance(value, datetime.timedelta):
+        return duration_string(value)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _notification(instance):
+    return {
+        name: _format(Interview._meta.get_field(name).to_python(getattr(instance, name)))
+        for name in NOTIFIED_FIELDS
+    }
+
+
+def _notify(action, instances, using):
+    if not settings.INTERVIEW_NOTIFICATIONS:
+        return
+    batch = uuid.uuid4().hex
+    _enqueue(tasks.send_interview_notifications.si(
+        batch, action, [_notification(instance) for instance in instances],
+    ), using)
+
+
+def _enqueue_written(dates, using):
+    _enqueue(tasks.refresh_rollups.si(dates), using)
+    _enqueue(tasks.invalidate_calendar(dates), using)
+
+
+@receiver(pre_save, sender=Interview)
+def interview_saving(sender, instance, using, **kwargs):
+    # An instance that was not loaded with these fields cannot tell what the
+    # save changes (or which date it leaves), so read the stored values
+    loaded = _loaded(instance)
+    if instance.pk is None or all(field in loaded for field in TRACKED_FIELDS):
+        return
+    stored = sender.objects.using(using).filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    if stored is not None:
+        instance._loaded_values = {**loaded, **stored}
+
+
+@receiver(post_save, sender=Interview)
+def interview_saved(sender, instance, created, using, **kwargs):
+    changes.record([
+        changes.change_for(instance, InterviewChange.CREATED if created else InterviewChange.UPDATED),
+    ], using)
+    _enqueue_written(_touched_dates(instance), using)
+    loaded = _loaded(instance)
+    if created or any(loaded.get(field) != getattr(instance, field) for field in NOTIFIED_FIELDS):
+        _notify('scheduled' if created else 'updated', [instance], using)
+    instance._loaded_values = {
+        field.attname: field.value_from_object(instance) for field in sender._meta.concrete_fields
+    }
+
+
+@receiver(post_delete, sender=Interview)
+def interview_deleted(sender, instance, using, **kwargs):
+    changes.record([changes.change_for(instance, InterviewChange.DELETED)], using)
+    _enqueue_written(_touched_dates(instance), using)
+    _notify('cancelled', [instance], using)
+
+
+@receiver(interviews_bulk_created, sender=Interview)
+def interviews_bulk_created_handler(sender, instances, using='default', **kwargs):
+    changes.record([changes.change_for(instance, InterviewChange.CREATED) for instance in instances], using)
+    dates = sorted({_format(instance.date) for instance in instances})
+    _enqueue_written(dates, using)
+    _notify('scheduled', instances, using)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # set_password() keeps the raw password in _password until save() ends
+    if not created and instance._password is not None:
+        denylist.revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    denylist.revoke_user(instance.pk)
@@ -0,0 +1,130 @@
+"""
+Background work that follows an interview write.
+
+The signal handlers in apis/signals.py queue these once the write commits,
+so a request only pays for its own INSERT, UPDATE or DELETE. Each task is
+safe to run twice or out of order, as a retried or redelivered task may be:
+rollups and snapshots are recomputed from the table rather than patched,
+bumping a cache version again only invalidates again, and a notification
+already sent for a write is not sent again.
+
+`prune_interview_changes` is periodic instead (settings.CELERY_BEAT_SCHEDULE).
+"""
+import datetime
+import logging
+
+from celery import chain, shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import exports, rollups
+from .cache import bump_dates
+from .models import InterviewChange, InterviewChangeWatermark
+
+logger = logging.getLogger(__name__)
+
+NOTIFIED_KEY = 'interview:notified:{}'
+
+SUBJECTS = {
+    'scheduled': 'Interview scheduled: {job_title}',
+    'updated': 'Interview updated: {job_title}',
+    'cancelled': 'Interview cancelled: {job_title}',
+}
+
+
+@shared_task
+def refresh_rollups(dates):
+    """Recompute the rollup buckets of `dates` (ISO strings)."""
+    return rollups.refresh(dates)
+
+
+@shared_task
+def invalidate_calendar_cache(dates):
+    """Invalidate every cached calendar window containing one of `dates`."""
+    bump_dates(datetime.date.fromisoformat(date) for date in dates)
+
+
+@shared_task
+def regenerate_month_exports(months):
+    """Rewrite the export snapshots of `months`, given as (year, month) pairs."""
+    for year, month in months:
+        exports.write_month_snapshots(year, month)
+
+
+def invalidate_calendar(dates):
+    """
+    The task signature that invalidates `dates`, followed by regenerating
+    their months' snapshots when INTERVIEW_EXPORT_SNAPSHOTS is on: a snapshot
+    is named for the cache versions, so it has to be made after the bump.
+    """
+    signature = invalidate_calendar_cache.si(dates)
+    if not settings.INTERVIEW_EXPORT_SNAPSHOTS:
+        return signature
+    months = sorted({(date.year, date.month) for date in map(datetime.date.fromisoformat, dates)})
+    return chain(signature, regenerate_month_exports.si(months))
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=5)
+def send_interview_notifications(batch, action, interviews):
+    """
+    Email each candidate in `interviews` (dicts of serialized fields) that
+    their interview was scheduled, updated or cancelled. `batch` identifies
+    the write that queued them; a message of that batch already sent within
+    INTERVIEW_NOTIFICATION_DEDUP_SECONDS is skipped, so a retry only sends
+    what the failed run did not.
+    """
+    sent = 0
+    with get_connection() as connection:
+        for position, interview in enumerate(interviews):
+            if not interview.get('email'):
+                continue
+            key = NOTIFIED_KEY.format(f'{batch}:{position}')
+            if not cache.add(key, True, settings.INTERVIEW_NOTIFICATION_DEDUP_SECONDS):
+                continue
+            interviewer = f", with {interview['interviewer']}" if interview.get('interviewer') else ''
+            message = EmailMessage(
+                subject=SUBJECTS[action].format(**interview),
+                body=(
+                    f"Hello {interview['interviewee']},\n\n"
+                    f"Your interview for {interview['job_title']} is {action}: "
+                    f"{interview['date']} at {interview['time']} ({interview['duration']}){interviewer}.\n"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[interview['email']],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception:
+                cache.delete(key)
+                raise
+            sent += 1
+    if sent:
+        logger.info("Interview notifications sent", extra={
+            'event': 'interview.notified', 'action': action, 'sent': sent, 'interviews': len(interviews),
+        })
+    return sent
+
+
+@shared_task
+def prune_interview_changes():
+    """
+    Delete change feed entries older than CHANGE_FEED_RETENTION_DAYS, always
+    a prefix of the log, and move the pruning watermark to its end in the
+    same transaction. The newest entry is always kept.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+    with transaction.atomic():
+        newest = InterviewChange.objects.aggregate(newest=Max('id'))['newest']
+        through = InterviewChange.objects.filter(
+            created_at__lt=cutoff, id__lt=newest or 0,
+        ).aggregate(through=Max('id'))['through']
+        if through is None:
+            return 0
+        deleted, _ = InterviewChange.objects.filter(id__lte=through).delete()
+        InterviewChangeWatermark.objects.update_or_create(pk=1, defaults={'pruned_through': through})
+    return deleted
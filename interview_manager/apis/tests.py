@@ -1,3 +1,1296 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gzip
+import importlib
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import runpy
+import sys
+import tempfile
+import unittest
+import zlib
+from base64 import urlsafe_b64encode
+from importlib.util import find_spec
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.pagination import Cursor
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .authentication import StatelessJWTAuthentication, denylist, tokens_for_user
+from .encoders import row_encoder_for
+from .logins import last_logins
+from .metrics import Histogram, registry
+from . import (
+    availability, benchmarks, cache as cache_versions, changes, compression, intervals, log, rollups, routers,
+    tasks,
+)
+from .models import Interview, InterviewChange, InterviewRollup, Roles, User
+from .serializers import InterviewSerializer
+from .views import (
+    AllInterviewsAPI, InterviewsByDateAPI, InterviewsByWeekAPI, InterviewsByWorkWeekAPI,
+    InterviewsByMonthAPI, InterviewsByDateRangeAPI, InterviewsByDepartmentAPI,
+)
+
+
+def setUpModule():
+    # Keep the apis JSON log lines out of the test output; assertLogs still sees them
+    logger = logging.getLogger('apis')
+    unittest.addModuleCleanup(logger.setLevel, logger.level)
+    logger.setLevel(logging.CRITICAL + 1)
+
+
+# Jane Doe's interview, 45 minutes from 10:00 on Monday 6 May 2024
+INTERVIEW = {
+    'interviewee': 'Jane Doe', 'date': datetime.date(2024, 5, 6), 'time': datetime.time(10),
+    'duration': datetime.timedelta(minutes=45), 'role': 'Junior', 'job_title': 'Engineer',
+    'business_area': 'Platform', 'department': 'Software',
+}
+
+
+def make_interview(**overrides):
+    return Interview.objects.create(**{**INTERVIEW, **overrides})
+
+
+async def amake_interview(**overrides):
+    return await Interview.objects.acreate(**{**INTERVIEW, **overrides})
+
+
+def interview_data(**overrides):
+    """The same interview as a request body, with contact details and an interviewer."""
+    return {
+        'interviewee': 'Jane Doe', 'email': 'jane@example.com', 'phone': '5550000000', 'date': '2024-05-06',
+        'time': '10:00', 'duration': '00:45:00', 'role': 'Junior', 'interviewer': 'Sam Smith',
+        'job_title': 'Engineer', 'business_area': 'Platform', 'department': 'Software', **overrides,
+    }
+
+
+class APITestCase(TestCase):
+    """Calls the API as a client of localhost, starting with an empty cache."""
+    client_class = APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_HOST'] = 'localhost'
+
+
+# Under interview_manager/test_settings.py the replica is a separate test
+# database that never receives default's rows. Tests that read through the
+# replica-routed views declare it, and pin every client to the primary as a
+# client reading its own writes would be; ReplicaRoutingTests covers the lag.
+REPLICA_DATABASES = {'default', routers.REPLICA} if routers.REPLICA in settings.DATABASES else {'default'}
+
+
+class PrimaryReadsMixin:
+    databases = REPLICA_DATABASES
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(mock.patch.object(routers, 'is_pinned', return_value=True))
+
+
+class KeysetPaginationTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Created out of calendar order, so id order and calendar order differ
+        self.interviews = [
+            make_interview(date=datetime.date(2024, 5, day), time=datetime.time(hour))
+            for day, hour in ((7, 9), (6, 11), (6, 9), (8, 10), (6, 10))
+        ]
+
+    def walk(self, url, direction):
+        pages = []
+        while url:
+            page = self.client.get(url).json()
+            pages.append([row['id'] for row in page['results']])
+            url = page[direction]
+        return pages
+
+    def test_pages_forward_and_back_by_id(self):
+        ids = [interview.pk for interview in self.interviews]
+        forward = self.walk(f"{reverse('all-interviews')}?page_size=2", 'next')
+        self.assertEqual(forward, [ids[0:2], ids[2:4], ids[4:]])
+
+        last = self.client.get(f"{reverse('all-interviews')}?page_size=2").json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        self.assertEqual(self.walk(last['previous'], 'previous'), [ids[2:4], ids[0:2]])
+
+    def test_calendar_pages_seek_on_date_time_and_id(self):
+        expected = [
+            interview.pk for interview in sorted(self.interviews, key=lambda i: (i.date, i.time, i.pk))
+        ]
+        url = f"{reverse('interviews-by-month')}?month=5&year=2024&page_size=2"
+        # A new interview on an earlier page does not shift the later ones
+        first = self.client.get(url).json()
+        make_interview(date=datetime.date(2024, 5, 1))
+        rest = self.walk(first['next'], 'next')
+        self.assertEqual([row['id'] for row in first['results']] + sum(rest, []), expected)
+
+    def test_tampered_cursor_is_not_found(self):
+        # A position with two values for the one-column ordering
+        cursor = urlsafe_b64encode(b'p=["1","2"]').decode()
+        response = self.client.get(reverse('all-interviews'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+class InterviewQueryPlanTests(TestCase):
+    """
+    EXPLAIN every interview listing query and fail on a full table scan.
+
+    The table is nearly empty, so on PostgreSQL sequential scans are disabled
+    for the session; a plan that still reports one has no usable index.
+    """
+    factory = APIRequestFactory()
+    table = Interview._meta.db_table
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.interview = make_interview()
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def get_queryset(self, view_class, params=None):
+        view = view_class()
+        view.request = Request(self.factory.get('/', params or {}))
+        view.format_kwarg = None
+        view.kwargs = {}
+        queryset = view.get_queryset()
+
+        paginator = view.paginator
+        if paginator is not None:
+            # Plan the seek that every page after the first makes
+            paginator.prepare(view.request, view)
+            position = [str(getattr(self.interview, field)) for field in paginator.ordering]
+            paginator.cursor = Cursor(offset=0, reverse=False, position=position)
+            queryset = paginator.get_page_queryset(queryset)
+        return queryset
+
+    def assertNoTableScan(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            self.assertNotIn(f'Seq Scan on {self.table}', plan)
+        else:
+            scans = [line for line in plan.splitlines() if f'SCAN {self.table}' in line]
+            self.assertEqual(scans, [], plan)
+
+    def test_all_interviews(self):
+        self.assertNoTableScan(self.get_queryset(AllInterviewsAPI))
+
+    def test_interviews_by_date(self):
+        self.assertNoTableScan(self.get_queryset(InterviewsByDateAPI, {'date': '2024-05-06'}))
+
+    def test_interviews_by_week(self):
+        self.assertNoTableScan(self.get_queryset(InterviewsByWeekAPI))
+
+    def test_interviews_by_work_week(self):
+        self.assertNoTableScan(self.get_queryset(InterviewsByWorkWeekAPI))
+
+    def test_interviews_by_month(self):
+        self.assertNoTableScan(self.get_queryset(InterviewsByMonthAPI, {'month': '5', 'year': '2024'}))
+
+    def test_interviews_by_date_range(self):
+        self.assertNoTableScan(self.get_queryset(
+            InterviewsByDateRangeAPI, {'start_date': '2024-05-01', 'end_date': '2024-05-31'}
+        ))
+
+    def test_interviews_by_department(self):
+        self.assertNoTableScan(self.get_queryset(InterviewsByDepartmentAPI, {'department': 'Software'}))
+
+
+class UserSearchTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for n, (first_name, last_name) in enumerate([
+            ('Jane', 'Doe'), ('Janet', 'Smith'), ('Bob', 'Janes'), ('Ann', 'Lee'), ('Sam', 'Jane-Roe'),
+        ]):
+            User.objects.create(
+                email=f'user{n}@example.com', first_name=first_name, last_name=last_name,
+                department='Software', role='Junior', phone=f'555000000{n}', password='!',
+            )
+
+    def search(self, **params):
+        return self.client.get(reverse('search_users'), params).json()
+
+    def walk(self, **params):
+        page = self.search(**params)
+        names = [user['first_name'] for user in page['users']]
+        while page['next']:
+            page = self.client.get(page['next']).json()
+            names += [user['first_name'] for user in page['users']]
+        return names
+
+    def test_substring_matches_in_one_order_across_pages(self):
+        everything = [user['first_name'] for user in self.search(q='JANE', limit=10)['users']]
+        self.assertCountEqual(everything, ['Jane', 'Janet', 'Bob', 'Sam'])
+        self.assertEqual(self.walk(q='jane', limit=1), everything)
+
+    def test_short_queries_and_phone_numbers_match(self):
+        self.assertEqual([user['first_name'] for user in self.search(q='an')['users']],
+                         ['Jane', 'Janet', 'Bob', 'Ann', 'Sam'])
+        self.assertEqual([user['email'] for user in self.search(q='5550000003')['users']], ['user3@example.com'])
+
+    @override_settings(USER_SEARCH_MAX_RESULTS=2)
+    def test_results_are_bounded(self):
+        self.assertEqual(len(self.walk(q='jane', limit=1)), 2)
+
+    def test_invalid_cursor_or_limit(self):
+        for params in ({'cursor': 'not-a-cursor'}, {'limit': '0'}, {'limit': 'ten'}):
+            response = self.client.get(reverse('search_users'), {'q': 'jane', **params})
+            self.assertEqual(response.status_code, 400, params)
+
+
+class CalendarCacheTests(PrimaryReadsMixin, APITestCase):
+    """Writes made with the ORM queue no invalidation, so cached responses go stale until a bump."""
+
+    def setUp(self):
+        super().setUp()
+        make_interview()
+        self.url = reverse('interviews-by-month')
+
+    def listed(self, month='5'):
+        return len(self.client.get(self.url, {'month': month, 'year': '2024'}).json()['results'])
+
+    def test_bump_invalidates_only_windows_holding_the_date(self):
+        self.assertEqual(self.listed(), 1)
+        make_interview(time=datetime.time(11))
+        # The same window, however its month is spelled
+        self.assertEqual(self.listed(month='05'), 1)
+
+        cache_versions.bump_dates([datetime.date(2024, 6, 3)])
+        self.assertEqual(self.listed(), 1)
+        cache_versions.bump_dates([datetime.date(2024, 5, 31)])
+        self.assertEqual(self.listed(), 2)
+
+    def test_api_writes_invalidate_once_committed(self):
+        self.assertEqual(self.listed(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('schedule-interview'), interview_data(time='11:00'), format='json')
+        self.assertEqual(self.listed(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('retrieve-update-destroy-interview', args=[response.data['id']]),
+                {'date': '2024-06-03'}, format='json',
+            )
+        # Moving an interview invalidates the date it left as well as the new one
+        self.assertEqual((self.listed(), self.listed(month='6')), (1, 1))
+
+    def test_evicted_version_never_comes_back(self):
+        date = datetime.date(2024, 5, 6)
+        [before] = cache_versions.get_versions([date])
+        cache_versions.bump_dates([date])
+        cache.delete(cache_versions.VERSION_KEY.format(date.isoformat()))
+        [after] = cache_versions.get_versions([date])
+        self.assertGreater(after, before)
+
+
+class BulkScheduleTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('bulk-schedule-interviews')
+        # The middle row is missing its interviewee, the last double-books the first
+        self.rows = [interview_data(), interview_data(interviewee=''), interview_data(interviewee='John Roe')]
+
+    def test_invalid_rows_are_skipped(self):
+        response = self.client.post(self.url, self.rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['ids'], list(Interview.objects.values_list('id', flat=True)))
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2])
+        self.assertIn('interviewer', response.data['errors'][1]['errors'])
+
+    def test_all_or_nothing_rejects_the_batch(self):
+        response = self.client.post(f'{self.url}?all_or_nothing=true', self.rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(Interview.objects.exists())
+
+    def test_ndjson_body(self):
+        body = '\n'.join(json.dumps(row) for row in self.rows[:1] + [interview_data(time='11:00')])
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual((response.status_code, response.data['created']), (201, 2))
+
+    @override_settings(INTERVIEW_BULK_MAX_ROWS=2)
+    def test_batch_size_is_limited(self):
+        response = self.client.post(self.url, self.rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Interview.objects.exists())
+
+
+class RowEncoderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        make_interview()
+        make_interview(
+            interviewee='Zoë Ng', email='zoe@example.com', phone='5550000001', time=datetime.time(9, 30, 15),
+            duration=datetime.timedelta(hours=1, seconds=1.5), interviewer='Sam Smith', additional_notes='',
+        )
+
+    def assertSameJSON(self, fields=None):
+        queryset = Interview.objects.order_by('id')
+        expected = InterviewSerializer(queryset, many=True).data
+        if fields is not None:
+            expected = [{name: row[name] for name in row if name in fields} for row in expected]
+        encoder = row_encoder_for(InterviewSerializer, fields)
+        rows = encoder.encode(queryset.values_list(*encoder.columns))
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_rows_render_byte_for_byte_as_the_serializer(self):
+        self.assertSameJSON()
+
+    def test_sparse_fields(self):
+        self.assertSameJSON(fields=frozenset({'id', 'date', 'duration', 'phone'}))
+
+    def test_timestamps_follow_the_current_timezone(self):
+        for zone in ('UTC', 'Asia/Kolkata'):
+            with self.subTest(zone=zone), timezone.override(zone):
+                self.assertSameJSON(fields=frozenset({'id', 'updated_at'}))
+
+
+class InterviewExportTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('export-interviews')
+        # Out of calendar order, with one in another department
+        for day, hour, department in ((7, 9, 'Software'), (6, 11, 'Software'), (6, 9, 'Testing')):
+            make_interview(date=datetime.date(2024, 5, day), time=datetime.time(hour), department=department)
+        self.expected = InterviewSerializer(Interview.objects.order_by('date', 'time', 'id'), many=True).data
+
+    @override_settings(INTERVIEW_EXPORT_CHUNK_SIZE=1)
+    def test_ndjson_streams_a_chunk_per_read(self):
+        response = self.client.get(self.url, {'month': '5', 'year': '2024'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([json.loads(line) for line in b''.join(chunks).splitlines()], self.expected)
+
+    def test_csv_has_a_header_and_filters(self):
+        response = self.client.get(self.url, {'format': 'csv', 'department': 'Software', 'fields': 'id,date,time'})
+        self.assertIn('interviews.csv', response['Content-Disposition'])
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        software = [[str(row['id']), row['date'], row['time']] for row in self.expected if row['department'] == 'Software']
+        self.assertEqual(rows, [['id', 'date', 'time'], *software])
+
+    @override_settings(INTERVIEW_EXPORT_CHUNK_SIZE=1)
+    async def test_export_streams_as_it_reads_under_asgi(self):
+        response = await self.async_client.get(self.url, {'month': '5', 'year': '2024'}, HTTP_HOST='localhost')
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([json.loads(line) for line in b''.join(chunks).splitlines()], self.expected)
+
+
+class DoubleBookingTests(APITestCase):
+
+    def test_index_built_by_adding_matches_a_linear_scan(self):
+        generator = random.Random(19)
+        index, stored = intervals.IntervalIndex(), []
+        for key in range(200):
+            start = generator.randrange(1000)
+            end = start + generator.randrange(1, 120)
+            index.add(start, end, key)
+            stored.append((start, end, key))
+
+            start = generator.randrange(1000)
+            end = start + generator.randrange(1, 60)
+            expected = {k for s, e, k in stored if s < end and e > start}
+            self.assertEqual(set(index.overlapping(start, end)), expected)
+        self.assertEqual(index._max_ends, intervals.IntervalIndex(stored)._max_ends)
+
+    def test_overlapping_bookings_are_rejected(self):
+        url = reverse('schedule-interview')
+        self.assertEqual(self.client.post(url, interview_data(), format='json').status_code, 201)
+        # Back to back is fine, overlapping by a minute is not
+        self.assertEqual(self.client.post(url, interview_data(time='10:45'), format='json').status_code, 201)
+        response = self.client.post(url, interview_data(time='11:29'), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('interviewer', response.data)
+
+    def test_booking_running_past_midnight_blocks_the_next_morning(self):
+        make_interview(interviewer='Sam Smith', time=datetime.time(23), duration=datetime.timedelta(hours=2))
+        response = self.client.post(
+            reverse('schedule-interview'), interview_data(date='2024-05-07', time='00:30'), format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_existing_double_bookings_are_found(self):
+        first = make_interview(interviewer='Sam Smith')
+        make_interview(interviewer='Sam Smith', time=datetime.time(11, 15))
+        second = make_interview(interviewer='Sam Smith', time=datetime.time(10, 30))
+        make_interview(interviewer='Alex Lee')
+        make_interview(interviewer='')
+        make_interview()
+        self.assertEqual(
+            [conflict[:3] for conflict in intervals.double_bookings(Interview.objects.all())],
+            [('Sam Smith', first.pk, second.pk)],
+        )
+        # Migration 0019 scans with its own copy, independent of apis.intervals
+        migration = importlib.import_module('apis.migrations.0019_interview_double_booking')
+        self.assertEqual(
+            [conflict[:3] for conflict in migration.find_double_bookings(Interview, 'default')],
+            [('Sam Smith', first.pk, second.pk)],
+        )
+
+
+class AvailabilityTests(APITestCase):
+
+    def test_busy_time_past_the_window_carries_into_the_next(self):
+        day = datetime.datetime(2024, 5, 6)
+        busy = [(day.replace(hour=16), day.replace(hour=11) + datetime.timedelta(days=1))]
+        windows = availability.working_windows(
+            day.date(), day.date() + datetime.timedelta(days=1), datetime.time(9), datetime.time(17)
+        )
+        slots = availability.free_slots(busy, windows, datetime.timedelta(hours=1), limit=20)
+        self.assertEqual([start.strftime('%d %H') for start, _ in slots], [
+            '06 09', '06 10', '06 11', '06 12', '06 13', '06 14', '06 15',
+            '07 11', '07 12', '07 13', '07 14', '07 15', '07 16',
+        ])
+
+    def test_common_slots_of_an_interviewer_group(self):
+        make_interview(interviewer='Sam Smith')
+        make_interview(interviewer='Alex Lee', time=datetime.time(9))
+        # Runs past midnight into Monday morning
+        make_interview(interviewer='Alex Lee', date=datetime.date(2024, 5, 5), time=datetime.time(23),
+                       duration=datetime.timedelta(hours=10, minutes=30))
+        response = self.client.get(reverse('interviewer-availability'), {
+            'interviewers': 'Sam Smith,Alex Lee', 'start_date': '2024-05-06', 'end_date': '2024-05-06',
+            'duration': '60', 'limit': '2',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [slot['start'] for slot in response.data['slots']], ['2024-05-06T10:45:00', '2024-05-06T11:45:00']
+        )
+
+    def test_invalid_parameters(self):
+        url = reverse('interviewer-availability')
+        params = {'interviewers': 'Sam Smith', 'start_date': '2024-05-06', 'end_date': '2024-05-06', 'duration': '60'}
+        for invalid in ({'interviewers': ''}, {'duration': '0'}, {'limit': '-1'}, {'day_start': '18:00'}):
+            response = self.client.get(url, {**params, **invalid})
+            self.assertEqual(response.status_code, 400, invalid)
+
+    def test_unreasonable_durations_are_rejected(self):
+        url = reverse('interviewer-availability')
+        params = {'interviewers': 'Sam Smith', 'start_date': '2024-05-06', 'end_date': '2024-05-06'}
+        for duration in ('99999999999999', '99999999999 00:00:00', '1441', '1 00:00:01', 'soon', ''):
+            response = self.client.get(url, {**params, 'duration': duration})
+            self.assertEqual(response.status_code, 400, duration)
+
+
+class BenchmarkTests(PrimaryReadsMixin, TestCase):
+
+    def seed(self, *args):
+        call_command(
+            'seed_interviews', '--interviews', '200', '--users', '5', '--days', '10', *args, stdout=io.StringIO()
+        )
+
+    def test_seeded_data_is_realistic_and_reproducible(self):
+        self.seed()
+        self.assertEqual((Interview.objects.count(), User.objects.count()), (200, 5))
+        self.assertEqual(list(intervals.double_bookings(Interview.objects.all())), [])
+        self.assertEqual(
+            InterviewRollup.objects.aggregate(total=Sum('count'))['total'], Interview.objects.count()
+        )
+
+        first = [(i.date, i.time, i.interviewer) for i in benchmarks.generate_interviews(50, seed=3)]
+        again = [(i.date, i.time, i.interviewer) for i in benchmarks.generate_interviews(50, seed=3)]
+        self.assertEqual(first, again)
+
+        self.seed('--clear')
+        self.assertEqual((Interview.objects.count(), User.objects.count()), (200, 5))
+
+    def test_routes_run_is_compared_with_its_baseline(self):
+        self.seed()
+        options = ['benchmark', 'routes', '--iterations', '2', '--warmup', '0', '--routes', 'all-interviews']
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = f'{directory}/baseline.json'
+            call_command(*options, '--output', baseline, stdout=io.StringIO())
+            with open(baseline) as f:
+                report = json.load(f)
+            self.assertEqual(report['routes']['all-interviews']['status'], 200)
+
+            # A baseline that made fewer queries turns this run into a regression
+            report['routes']['all-interviews']['queries'] -= 1
+            with open(baseline, 'w') as f:
+                json.dump(report, f)
+            with self.assertRaisesMessage(CommandError, 'all-interviews: queries'):
+                call_command(*options, '--baseline', baseline, stdout=io.StringIO())
+
+    def test_serialization_speedup_is_checked_against_its_target(self):
+        self.seed()
+        options = ['benchmark', 'serialization', '--rows', '200', '--repeat', '1']
+        stdout = io.StringIO()
+        call_command(*options, '--target', '0', stdout=stdout)
+        self.assertTrue(json.loads(stdout.getvalue())['identical_json'])
+        with self.assertRaisesMessage(CommandError, 'serialize:'):
+            call_command(*options, '--target', '1000', stdout=io.StringIO())
+
+
+class MetricsTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def test_histogram_buckets_bound_the_relative_error(self):
+        histogram = Histogram()
+        for value in range(2 * Histogram.SUB_BUCKETS):
+            # Small values have a bucket each
+            self.assertEqual(Histogram.highest_equivalent(Histogram.index_of(value)), value)
+        for value in (64, 65, 1000, 123_456, 10 ** 9):
+            upper = Histogram.highest_equivalent(Histogram.index_of(value))
+            self.assertLessEqual(value, upper)
+            self.assertLess(upper - value, value / Histogram.SUB_BUCKETS)
+
+        for value in range(1, 1001):
+            histogram.record(value)
+        self.assertEqual((histogram.count, histogram.total, histogram.max), (1000, 500500, 1000))
+        for fraction in (0.5, 0.9, 0.99):
+            self.assertAlmostEqual(histogram.quantile(fraction), fraction * 1000, delta=fraction * 1000 / 32)
+        self.assertEqual(histogram.quantile(1), 1000)
+        self.assertEqual(Histogram().quantile(0.5), 0)
+
+    def test_requests_are_exposed_per_route(self):
+        make_interview()
+        self.client.get(reverse('all-interviews'))
+        self.client.get(reverse('all-interviews'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('# TYPE apis_request_duration_seconds summary', text)
+        self.assertIn('apis_requests_total{route="all-interviews",method="GET",status="200"} 2', text)
+        self.assertIn('apis_db_queries_count{route="all-interviews"} 2', text)
+        self.assertIn('apis_db_queries{route="all-interviews",quantile="0.5"} 1', text)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=1)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        # Every clock reading in the middleware is a second after the last
+        with mock.patch('apis.middleware.time') as clock:
+            clock.perf_counter.side_effect = itertools.count()
+            with self.assertLogs('apis.middleware', 'WARNING') as logs:
+                self.client.get(reverse('all-interviews'))
+        [record] = logs.records
+        self.assertEqual((record.event, record.route), ('request.slow', 'all-interviews'))
+        self.assertIn('apis_interview', record.sql[0]['sql'])
+
+    async def test_queries_are_counted_under_asgi(self):
+        await amake_interview()
+        for name in ('all-interviews', 'interviews-by-date-range'):
+            await self.async_client.get(
+                reverse(name), {'start_date': '2024-05-01', 'end_date': '2024-05-31'}, HTTP_HOST='localhost',
+            )
+            queries = re.search(rf'^apis_db_queries_sum{{route="{name}"}} (\d+)$', registry.render(), re.MULTILINE)
+            self.assertGreater(int(queries[1]), 0, name)
+
+
+class StatelessAuthenticationTests(TestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        denylist.clear()
+        self.user = User.objects.create_user(
+            email='jane@example.com', password='s3cret-Passw0rd', department='Software', role='Junior',
+            first_name='Jane', last_name='Doe',
+        )
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def authenticate(self):
+        token = tokens_for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return token
+
+    def test_user_comes_from_claims(self):
+        token = tokens_for_user(self.user).access_token
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(0):
+            user, _ = StatelessJWTAuthentication().authenticate(request)
+        self.assertEqual(user.id, self.user.pk)
+        self.assertEqual((user.email, user.department, user.role), ('jane@example.com', 'Software', 'Junior'))
+
+    def test_read_endpoint_makes_no_auth_query(self):
+        self.authenticate()
+        # The listing itself is the only query
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('all-interviews'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_revoked_token_is_rejected(self):
+        token = self.authenticate()
+        denylist.revoke_token(token)
+        self.assertEqual(self.client.get(reverse('get-roles')).status_code, 401)
+
+    def test_logout_revokes_only_the_token_used(self):
+        self.authenticate()
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('get-roles')).status_code, 401)
+
+        # Another session of the same user is unaffected
+        self.authenticate()
+        self.assertEqual(self.client.get(reverse('get-roles')).status_code, 200)
+        self.client.credentials()
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 401)
+
+    def test_password_change_revokes_earlier_tokens(self):
+        token = self.authenticate()
+        # Tokens issued in the second of the change stay valid
+        token['iat'] -= 1
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.user.set_password('n3w-Passw0rd!')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('get-roles')).status_code, 401)
+
+
+@override_settings(LAST_LOGIN_FLUSH_SECONDS=0)
+class LoginTests(TestCase):
+    password = 's3cret-Passw0rd'
+
+    def setUp(self):
+        self.addCleanup(last_logins.clear)
+        self.user = User.objects.create(
+            email='jane@example.com', password=make_password(self.password, hasher='pbkdf2_sha256'),
+            department='Software', role='Junior', first_name='Jane', last_name='Doe',
+        )
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'email': self.user.email, 'password': self.password})
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_upgrades_hash_to_preferred_hasher(self):
+        self.login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(get_hasher().algorithm + '$'))
+        self.assertIsNotNone(self.user.last_login)
+        self.login()
+
+    @override_settings(LAST_LOGIN_FLUSH_SECONDS=60)
+    def test_last_login_is_written_in_batches(self):
+        self.login()
+        self.login()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(last_logins.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+
+class LoggingTests(unittest.TestCase):
+
+    def record(self, event=None, **extra):
+        record = logging.LogRecord('apis.test', logging.INFO, __file__, 1, 'Hello %s', ('world',), None)
+        record.__dict__.update(extra, **({'event': event} if event else {}))
+        return record
+
+    def test_sampled_events_keep_their_share(self):
+        events = log.EventFilter({'login.succeeded': {'sample': 0.25}})
+        with mock.patch('apis.log.random.random', side_effect=[0.1, 0.3, 0.2, 0.9]):
+            records = [self.record('login.succeeded') for _ in range(4)]
+            kept = [record for record in records if events.filter(record)]
+        self.assertEqual([record.sample_rate for record in kept], [0.25, 0.25])
+        self.assertTrue(events.filter(self.record('login.failed')))
+        self.assertTrue(events.filter(self.record()))
+
+    def test_rate_limited_events_report_what_they_dropped(self):
+        events = log.EventFilter({'login.failed': {'rate': 2, 'per': 1.0}})
+        with mock.patch('apis.log.time.monotonic', return_value=100.0) as clock:
+            passed = [events.filter(self.record('login.failed')) for _ in range(5)]
+            self.assertEqual(passed, [True, True, False, False, False])
+            # Half a second refills one token
+            clock.return_value = 100.5
+            record = self.record('login.failed')
+            self.assertTrue(events.filter(record))
+            self.assertEqual(record.suppressed, 3)
+            self.assertFalse(events.filter(self.record('login.failed')))
+
+    def test_records_are_written_as_json_lines_off_the_thread(self):
+        stream = io.StringIO()
+        handler = log.QueueingHandler(stream)
+        handler.setFormatter(log.JSONFormatter())
+        record = self.record('login.failed', email='zoë@example.com', at=datetime.date(2024, 5, 6))
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record.exc_info = sys.exc_info()
+        handler.handle(record)
+        handler.close()
+
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(
+            {key: entry[key] for key in ('level', 'logger', 'message', 'event', 'email', 'at')},
+            {'level': 'INFO', 'logger': 'apis.test', 'message': 'Hello world', 'event': 'login.failed',
+             'email': 'zoë@example.com', 'at': '2024-05-06'},
+        )
+        self.assertIn('ValueError: boom', entry['exception'])
+
+
+class InterviewRollupTests(TestCase):
+    """Rollups are refreshed by tasks queued when a write commits."""
+
+    def snapshot(self):
+        return sorted(
+            InterviewRollup.objects.filter(count__gt=0).values_list('date', 'department', 'role', 'count', 'total_duration')
+        )
+
+    def assertMatchesRebuild(self):
+        maintained = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(maintained, self.snapshot())
+
+    def make(self, **overrides):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_interview(**overrides)
+
+    def test_signals_keep_rollups_current(self):
+        first = self.make()
+        second = self.make(role='Senior', duration=datetime.timedelta(minutes=30))
+        self.make(date=datetime.date(2024, 5, 7))
+        self.assertMatchesRebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.date = datetime.date(2024, 5, 8)
+            first.save()
+            # An instance that was not loaded from the database
+            Interview(pk=second.pk, **{
+                field: getattr(second, field) for field in ('interviewee', 'date', 'time', 'role', 'job_title',
+                                                              'business_area', 'department')
+            }, duration=datetime.timedelta(hours=1)).save()
+        self.assertMatchesRebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertMatchesRebuild()
+
+    def test_bulk_scheduling_updates_rollups(self):
+        serializer = InterviewSerializer(many=True, data=[
+            interview_data(
+                interviewee=f'Candidate {n}', time=f'{9 + n}:00', duration='00:30:00',
+                interviewer=f'Interviewer {n}', department='Testing',
+            )
+            for n in range(3)
+        ])
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        self.assertEqual(self.snapshot(), [
+            (datetime.date(2024, 5, 6), 'Testing', 'Junior', 3, datetime.timedelta(minutes=90)),
+        ])
+        self.assertMatchesRebuild()
+
+    def test_stats_endpoint(self):
+        self.make()
+        self.make(date=datetime.date(2024, 5, 8))
+        response = APIClient(HTTP_HOST='localhost').get(reverse('interview-stats'), {
+            'start_date': '2024-05-01', 'end_date': '2024-05-31', 'group_by': 'week',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['buckets'], [
+            {'period': '2024-05-06', 'department': 'Software', 'role': 'Junior', 'count': 2,
+             'total_duration': '01:30:00'},
+        ])
+        self.assertEqual(response.data['total'], {'count': 2, 'total_duration': '01:30:00'})
+
+
+class InterviewTaskTests(APITestCase):
+    """Side effects of interview writes, run by eager Celery tasks."""
+    interview = interview_data()
+
+    @override_settings(INTERVIEW_NOTIFICATIONS=True)
+    def test_write_queues_side_effects_until_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse('schedule-interview'), self.interview, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(InterviewRollup.objects.exists())
+        self.assertEqual(mail.outbox, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(InterviewRollup.objects.get().count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['jane@example.com'])
+
+        # A save that changes nothing a candidate sees sends no update
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('retrieve-update-destroy-interview', args=[response.data['id']]),
+                {'additional_notes': 'Bring a laptop'}, format='json',
+            )
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_candidates_are_not_emailed_unless_enabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('schedule-interview'), self.interview, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(InterviewRollup.objects.get().count, 1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_tasks_can_run_twice(self):
+        make_interview(email='jane@example.com', interviewer='Sam Smith')
+        for _ in range(2):
+            tasks.refresh_rollups.delay(['2024-05-06'])
+            tasks.send_interview_notifications.delay('batch', 'scheduled', [self.interview])
+        self.assertEqual(InterviewRollup.objects.get().count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_month_export_is_served_from_a_current_snapshot(self):
+        params = {'month': '5', 'year': '2024', 'format': 'csv'}
+        with tempfile.TemporaryDirectory() as media_root, self.settings(
+            INTERVIEW_EXPORT_SNAPSHOTS=True, MEDIA_ROOT=media_root,
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('schedule-interview'), self.interview, format='json')
+            exported = self.client.get(reverse('export-interviews'), params)
+            self.assertIn('filename', exported.get('Content-Disposition'))
+            self.assertTrue(hasattr(exported, 'file_to_stream'))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('retrieve-update-destroy-interview', args=[response.data['id']]),
+                    {'interviewee': 'Jane Roe'}, format='json',
+                )
+            exported = self.client.get(reverse('export-interviews'), params)
+            self.assertTrue(hasattr(exported, 'file_to_stream'))
+            snapshot = b''.join(exported.streaming_content)
+            with self.settings(INTERVIEW_EXPORT_SNAPSHOTS=False):
+                live = b''.join(self.client.get(reverse('export-interviews'), params).streaming_content)
+        self.assertIn(b'Jane Roe', snapshot)
+        self.assertEqual(snapshot, live)
+
+
+@skipUnless(routers.replica_configured(), 'needs a replica database that does not mirror default')
+class ReplicaRoutingTests(APITestCase):
+    """
+    Runs with a 'replica' alias that is not a test mirror, as in
+    interview_manager/test_settings.py. Its test database never receives the
+    rows written to default, so it stands in for a replica that has not
+    caught up.
+    """
+    databases = REPLICA_DATABASES
+
+    def setUp(self):
+        super().setUp()
+        self.client.post(reverse('schedule-interview'), interview_data(), format='json')
+
+    def listed(self, client):
+        return client.get(reverse('interviews-by-date'), {'date': '2024-05-06'}).json()
+
+    def test_writer_reads_own_writes(self):
+        self.assertIn(routers.PIN_COOKIE, self.client.cookies)
+        self.assertEqual(len(self.listed(self.client)), 1)
+
+    def test_other_clients_read_the_replica(self):
+        self.assertEqual(self.listed(APIClient(HTTP_HOST='localhost')), [])
+
+    def test_lagging_replica_read_is_not_cached(self):
+        month = {'month': '5', 'year': '2024'}
+        APIClient(HTTP_HOST='localhost').get(reverse('interviews-by-month'), month)
+        self.assertEqual(len(self.client.get(reverse('interviews-by-month'), month).json()['results']), 1)
+
+    def test_authenticated_writer_is_pinned_without_cookie(self):
+        user = User.objects.create_user('writer@example.com', 'x', 'Software', 'Junior')
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user)
+        self.assertEqual(self.listed(client), [])
+        client.post(reverse('schedule-interview'), interview_data(time='11:00'), format='json')
+        client.cookies.clear()
+        self.assertEqual(len(self.listed(client)), 2)
+
+    def test_batch_reads_the_replica_without_pinning(self):
+        client = APIClient(HTTP_HOST='localhost')
+        response = client.post(reverse('batch'), {'queries': {
+            'day': {'endpoint': 'date', 'params': {'date': '2024-05-06'}},
+        }}, format='json')
+        self.assertEqual(response.json()['results']['day']['data'], [])
+        self.assertNotIn(routers.PIN_COOKIE, client.cookies)
+
+
+class DatabaseSettingsTests(unittest.TestCase):
+    """The project settings, read again under a given environment."""
+    environ = {'DB_NAME': 'interviews', 'DB_USER': 'app', 'DB_PASSWORD': 'secret', 'DB_HOST': 'primary'}
+
+    def read_databases(self, **environ):
+        path = settings.BASE_DIR / 'interview_manager' / 'settings.py'
+        with mock.patch.dict(os.environ, {**self.environ, **environ}):
+            return runpy.run_path(str(path))['DATABASES']
+
+    def test_connections_persist_unless_pooled(self):
+        default = self.read_databases(DB_POOL='False')['default']
+        self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertNotIn('pool', default['OPTIONS'])
+
+        default = self.read_databases(DB_POOL='True', DB_POOL_MAX_SIZE='4')['default']
+        self.assertEqual((default['CONN_MAX_AGE'], default['OPTIONS']['pool']['max_size']), (0, 4))
+
+    def test_replica_has_its_own_options(self):
+        databases = self.read_databases(DB_POOL='True', DB_REPLICA_HOST='replica')
+        replica, default = databases['replica'], databases['default']
+        self.assertEqual((replica['HOST'], replica['PORT']), ('replica', '5432'))
+        self.assertEqual(replica['OPTIONS'], default['OPTIONS'])
+        replica['OPTIONS']['pool']['max_size'] = 2
+        self.assertEqual(default['OPTIONS']['pool']['max_size'], 10)
+
+
+class ConditionalRequestTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.interview = make_interview()
+        self.detail = reverse('retrieve-update-destroy-interview', args=[self.interview.pk])
+
+    def test_listing_not_modified_until_rows_change(self):
+        url, params = reverse('interviews-by-date'), {'date': '2024-05-06'}
+        etag = self.client.get(url, params)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.content), (304, b''))
+
+        Interview.objects.filter(pk=self.interview.pk).delete()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_warm_calendar_listing_revalidates_without_queries(self):
+        url, params = reverse('interviews-by-month'), {'month': '5', 'year': '2024'}
+        etag = self.client.get(url, params)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        cache_versions.bump_dates([self.interview.date])
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_last_modified_round_trips_in_whole_seconds(self):
+        updated_at = datetime.datetime(2024, 5, 1, 12, 0, 0, 750000, tzinfo=datetime.timezone.utc)
+        Interview.objects.filter(pk=self.interview.pk).update(updated_at=updated_at)
+        last_modified = self.client.get(self.detail)['Last-Modified']
+        self.assertEqual(last_modified, 'Wed, 01 May 2024 12:00:00 GMT')
+
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.patch(
+            self.detail, {'interviewee': 'Jane Roe'}, format='json', HTTP_IF_UNMODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(
+            self.detail, {'interviewee': 'Janet Doe'}, format='json', HTTP_IF_UNMODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, 412)
+
+    def test_update_with_stale_if_match_fails(self):
+        etag = self.client.get(self.detail)['ETag']
+        response = self.client.patch(self.detail, {'interviewee': 'Jane Roe'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.detail, {'interviewee': 'Janet Doe'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.interview.refresh_from_db()
+        self.assertEqual(self.interview.interviewee, 'Jane Roe')
+
+
+class InterviewChangeFeedTests(PrimaryReadsMixin, APITestCase):
+    """The change log and its event stream, woken through an in-process broker."""
+
+    def setUp(self):
+        super().setUp()
+        self.broker = changes.LocalBroker()
+        patcher = mock.patch.object(changes, 'get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_write_is_logged_in_order(self):
+        interview = make_interview()
+        Interview.objects.bulk_create([Interview(**{**INTERVIEW, 'interviewee': 'John Roe'})])
+        interview.department = 'Testing'
+        interview.save()
+        Interview.objects.get(pk=interview.pk).delete()
+
+        log = list(InterviewChange.objects.order_by('id'))
+        self.assertEqual([change.action for change in log], ['created', 'updated', 'deleted'])
+        self.assertEqual(log[0].data['interviewee'], 'Jane Doe')
+        self.assertEqual((log[1].department, log[1].previous_department), ('Testing', 'Software'))
+        self.assertIsNone(log[2].data)
+
+    def test_bulk_created_interviews_are_logged(self):
+        rows = [interview_data(), interview_data(interviewee='John Roe', time='11:00')]
+        response = self.client.post(reverse('bulk-schedule-interviews'), rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(InterviewChange.objects.filter(action='created').count(), 2)
+
+    def test_sync_returns_net_changes_and_tombstones(self):
+        url = reverse('interview-sync')
+        kept = make_interview()
+        deleted = make_interview(interviewee='John Roe')
+        since = self.client.get(url).json()['next']
+
+        kept.interviewee = 'Jane Roe'
+        kept.save()
+        Interview.objects.get(pk=deleted.pk).delete()
+        added = make_interview(interviewee='Jo Bloggs')
+        with self.assertNumQueries(1):
+            page = self.client.get(url, {'since': since}).json()
+        self.assertEqual([row['interviewee'] for row in page['interviews']], ['Jane Roe', 'Jo Bloggs'])
+        self.assertEqual(page['deleted'], [deleted.pk])
+        self.assertFalse(page['more'])
+
+        first = self.client.get(url, {'since': since, 'limit': 2}).json()
+        self.assertTrue(first['more'])
+        rest = self.client.get(url, {'since': first['next']}).json()
+        self.assertEqual(([row['id'] for row in rest['interviews']], rest['next']), ([added.pk], page['next']))
+
+    def test_sync_token_older_than_the_log_is_gone(self):
+        for name in ('Jane Doe', 'John Roe', 'Jo Bloggs'):
+            make_interview(interviewee=name)
+        oldest = InterviewChange.objects.order_by('id').first()
+        InterviewChange.objects.filter(pk=oldest.pk).update(created_at=oldest.created_at - datetime.timedelta(days=30))
+        tasks.prune_interview_changes()
+
+        response = self.client.get(reverse('interview-sync'), {'since': oldest.pk - 1})
+        self.assertEqual(response.status_code, 410)
+        response = self.client.get(reverse('interview-sync'), {'since': oldest.pk})
+        self.assertEqual(response.status_code, 200)
+
+    def test_sequence_gap_is_not_an_expired_log(self):
+        # A rolled back append leaves a gap that pruning did not make
+        rolled_back = make_interview(interviewee='Jane Doe')
+        InterviewChange.objects.filter(interview_id=rolled_back.pk).delete()
+        make_interview(interviewee='John Roe')
+
+        response = self.client.get(reverse('interview-sync'), {'since': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['interviewee'] for row in response.json()['interviews']], ['John Roe'])
+
+    async def test_stream_resumes_after_last_event_id(self):
+        seen = await amake_interview()
+        await amake_interview(department='Testing')
+        missed = await amake_interview(interviewee='John Roe')
+        last_event_id = (await InterviewChange.objects.aget(interview_id=seen.pk)).id
+
+        response = await self.async_client.get(
+            reverse('interview-changes'), {'department': 'Software'},
+            HTTP_HOST='localhost', headers={'Last-Event-ID': str(last_event_id)},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b'retry: '))
+        event = (await anext(events)).decode()
+        self.assertIn('event: created', event)
+        self.assertIn(f'"id":{missed.pk}', event)
+        await response.streaming_content.aclose()
+
+    @override_settings(CHANGE_FEED_POLL_SECONDS=60)
+    async def test_stream_wakes_when_a_change_is_published(self):
+        response = await self.async_client.get(reverse('interview-changes'), HTTP_HOST='localhost')
+        events = aiter(response.streaming_content)
+        await anext(events)
+
+        waiting = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.05)
+        self.assertFalse(waiting.done())
+        # Commit callbacks never run inside a TestCase, so publish by hand
+        interview = await amake_interview()
+        self.broker.publish(interview.pk)
+        event = (await asyncio.wait_for(waiting, 5)).decode()
+        self.assertIn(f'"id":{interview.pk}', event)
+        await response.streaming_content.aclose()
+
+    def test_stream_is_refused_under_wsgi(self):
+        response = self.client.get(reverse('interview-changes'))
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('ASGI', response.json()['error'])
+
+    async def test_stream_rejects_a_malformed_last_event_id(self):
+        response = await self.async_client.get(
+            reverse('interview-changes'), HTTP_HOST='localhost', headers={'Last-Event-ID': 'latest'},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SparseFieldsetTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first, self.second = [
+            make_interview(time=datetime.time(hour), additional_notes='Long notes') for hour in (10, 11)
+        ]
+
+    def test_listing_reads_and_renders_only_requested_fields(self):
+        url = reverse('interviews-by-date')
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get(url, {'date': '2024-05-06', 'fields': 'calendar'}).json()
+        self.assertEqual(set(rows[0]), {'id', 'interviewee', 'date', 'time', 'duration', 'department'})
+        self.assertNotIn('additional_notes', queries[-1]['sql'])
+
+        rows = self.client.get(url, {'date': '2024-05-06', 'fields': 'role'}).json()
+        self.assertEqual(rows[0], {'id': self.first.pk, 'role': 'Junior'})
+        response = self.client.get(url, {'date': '2024-05-06', 'fields': 'full'})
+        self.assertIn('additional_notes', response.json()[0])
+
+    def test_pages_follow_when_ordering_columns_are_left_out(self):
+        params = {'month': '5', 'year': '2024', 'fields': 'interviewee', 'page_size': '1'}
+        first = self.client.get(reverse('interviews-by-month'), params).json()
+        self.assertEqual(first['results'], [{'id': self.first.pk, 'interviewee': 'Jane Doe'}])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], [self.second.pk])
+
+    def test_detail_and_unknown_fields(self):
+        url = reverse('retrieve-update-destroy-interview', args=[self.second.pk])
+        response = self.client.get(url, {'fields': 'date,time'})
+        self.assertEqual(response.json(), {'id': self.second.pk, 'date': '2024-05-06', 'time': '11:00:00'})
+        self.assertIn('ETag', response)
+        response = self.client.get(reverse('all-interviews'), {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.software = make_interview()
+        self.testing = make_interview(time=datetime.time(11), department='Testing')
+        self.role = Roles.objects.create(job_title='Engineer')
+
+    def test_batch_runs_queries_and_deduplicates_rows(self):
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('batch'), {
+                'interviews': [self.software.pk, self.testing.pk, 999999],
+                'queries': {
+                    'software': {'endpoint': 'department', 'params': {'department': 'Software'}},
+                    'day': {'endpoint': 'date', 'params': {'date': '2024-05-06'}},
+                    'roles': {'endpoint': 'roles'},
+                },
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(sorted(data['interviews']), sorted([str(self.software.pk), str(self.testing.pk)]))
+        self.assertEqual(data['missing'], [999999])
+        self.assertEqual(data['results']['software']['data']['interviews'], [self.software.pk])
+        self.assertEqual(data['results']['day']['data'], [self.software.pk, self.testing.pk])
+        self.assertEqual(data['results']['roles']['data']['roles'], [{'id': self.role.pk, 'job_title': 'Engineer'}])
+        # The same rows a direct request returns
+        direct = self.client.get(reverse('interviews-by-date'), {'date': '2024-05-06'}).json()
+        self.assertEqual(direct, [data['interviews'][str(row['id'])] for row in direct])
+
+    def test_failing_query_does_not_fail_the_batch(self):
+        response = self.client.post(reverse('batch'), {'queries': {
+            'bad': {'endpoint': 'date-range', 'params': {'start_date': 'soon', 'end_date': '2024-05-06'}},
+            'unknown': {'endpoint': 'users'},
+            'week': {'endpoint': 'week'},
+        }}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([results[name]['status'] for name in ('bad', 'unknown', 'week')], [400, 400, 200])
+
+
+@override_settings(COMPRESSION_ENCODINGS=['gzip'], COMPRESSION_MIN_BYTES=200)
+class CompressionTests(PrimaryReadsMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for hour in range(9, 17):
+            self.interview = make_interview(time=datetime.time(hour))
+        self.listing = (reverse('interviews-by-date'), {'date': '2024-05-06'})
+
+    def test_listing_is_compressed_when_accepted(self):
+        plain = self.client.get(*self.listing)
+        response = self.client.get(*self.listing, HTTP_ACCEPT_ENCODING='br;q=0.9, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+
+        response = self.client.get(*self.listing, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_export_is_compressed_as_it_streams(self):
+        params = {'date': '2024-05-06', 'format': 'ndjson'}
+        plain = b''.join(self.client.get(reverse('export-interviews'), params).streaming_content)
+        response = self.client.get(reverse('export-interviews'), params, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    @override_settings(COMPRESSION_MIN_BYTES=0)
+    def test_strong_etag_responses_are_left_alone(self):
+        url = reverse('retrieve-update-destroy-interview', args=[self.interview.pk])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_choose_encoding(self):
+        encodings = ['br', 'zstd', 'gzip']
+        self.assertEqual(compression.choose_encoding('gzip, deflate, br, zstd', encodings), 'br')
+        self.assertEqual(compression.choose_encoding('gzip, br;q=0.5', encodings), 'gzip')
+        self.assertEqual(compression.choose_encoding('*;q=0.1, br;q=0', encodings), 'zstd')
+        self.assertIsNone(compression.choose_encoding('identity', encodings))
+        self.assertIsNone(compression.choose_encoding('', encodings))
+
+    @skipUnless(find_spec('brotli') and find_spec('zstandard'), 'needs the brotli and zstandard packages')
+    def test_streamed_chunks_decompress_as_they_arrive(self):
+        import brotli
+        import zstandard
+
+        decompressors = {
+            'br': brotli.Decompressor().process,
+            'zstd': zstandard.ZstdDecompressor().decompressobj().decompress,
+            'gzip': zlib.decompressobj(16 + zlib.MAX_WBITS).decompress,
+        }
+        chunks = [b'{"id":%d}\n' % n * 50 for n in range(3)]
+        for encoding, decompress in decompressors.items():
+            with self.subTest(encoding):
+                # Each flushed chunk decodes on its own, before the stream ends
+                stream = compression.compress_stream(chunks, encoding)
+                self.assertEqual([decompress(next(stream)) for _ in chunks], chunks)
+
+    @skipUnless(settings.INTERVIEW_MSGPACK, 'needs the msgpack package')
+    def test_messagepack_listing_and_body(self):
+        import msgpack
+
+        plain = self.client.get(*self.listing).json()
+        response = self.client.get(*self.listing, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), plain)
+
+        body = interview_data(time='18:00')
+        response = self.client.post(
+            reverse('schedule-interview'), msgpack.packb(body), content_type='application/msgpack',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        response = self.client.post(reverse('schedule-interview'), b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, 400)
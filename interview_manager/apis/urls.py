@@ -1,20 +1,42 @@
 from django.urls import path
+from django.conf import settings
 from django.contrib import admin
 from .views import *
+from .async_views import AsyncListView, EventStreamView
+from .routers import primary_pin_exempt
+
+
+def list_view(view_class):
+    # Read-only listings can be served on the event loop under ASGI
+    if settings.INTERVIEW_ASYNC_VIEWS:
+        return AsyncListView.as_view(view_class=view_class)
+    return view_class.as_view()
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/login/', LoginUserView.as_view(), name='login'),
+    path('api/logout/', LogoutUserView.as_view(), name='logout'),
     path('api/register/', RegisterUserView.as_view(), name='register'),
     path('api/interview/schedule/', ScheduleInterviewAPI.as_view(), name='schedule-interview'),
-    path('api/interview/all/', AllInterviewsAPI.as_view(), name='all-interviews'),
-    path('api/interview/date/', InterviewsByDateAPI.as_view(), name='interviews-by-date'),
-    path('api/interview/week/', InterviewsByWeekAPI.as_view(), name='interviews-by-week'),
-    path('api/interview/work-week/', InterviewsByWorkWeekAPI.as_view(), name='interviews-by-work-week'),
-    path('api/interview/month/', InterviewsByMonthAPI.as_view(), name='interviews-by-month'),
-    path('api/interview/date-range/', InterviewsByDateRangeAPI.as_view(), name='interviews-by-date-range'),
+    path('api/interview/schedule/bulk/', BulkScheduleInterviewAPI.as_view(), name='bulk-schedule-interviews'),
+    path('api/interview/all/', list_view(AllInterviewsAPI), name='all-interviews'),
+    path('api/interview/date/', list_view(InterviewsByDateAPI), name='interviews-by-date'),
+    path('api/interview/week/', list_view(InterviewsByWeekAPI), name='interviews-by-week'),
+    path('api/interview/work-week/', list_view(InterviewsByWorkWeekAPI), name='interviews-by-work-week'),
+    path('api/interview/month/', list_view(InterviewsByMonthAPI), name='interviews-by-month'),
+    path('api/interview/date-range/', list_view(InterviewsByDateRangeAPI), name='interviews-by-date-range'),
+    path('api/interview/changes/', EventStreamView.as_view(view_class=InterviewChangeStreamAPI),
+         name='interview-changes'),
+    path('api/interview/sync/', InterviewSyncAPI.as_view(), name='interview-sync'),
+    path('api/interview/export/', InterviewExportAPI.as_view(), name='export-interviews'),
+    path('api/interview/conflicts/', InterviewConflictsAPI.as_view(), name='interview-conflicts'),
+    path('api/interview/availability/', InterviewerAvailabilityAPI.as_view(), name='interviewer-availability'),
+    path('api/interview/stats/', InterviewStatsAPI.as_view(), name='interview-stats'),
+    path('api/batch/', primary_pin_exempt(BatchAPI.as_view()), name='batch'),
+    path('api/metrics/', MetricsAPI.as_view(), name='metrics'),
     path('api/roles/', GetRolesView.as_view(), name='get-roles'),
-    path('api/interview/department/', InterviewsByDepartmentAPI.as_view(), name='interviews-by-department'),
+    path('api/interview/department/', list_view(InterviewsByDepartmentAPI), name='interviews-by-department'),
     path('api/interview/<int:pk>/', GetUpdateDestroyInterviewAPI.as_view(), name='retrieve-update-destroy-interview'),
     path('api/users/search/', search_users, name='search_users'),
 ]
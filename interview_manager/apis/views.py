@@ -3,21 +3,65 @@ from rest_framework.response import Response
 from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view
-from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import LoginSerializer, RegistrationSerializer, InterviewSerializer, RoleSerializer
-from .models import User, Interview, Roles
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
+from .serializers import (
+    LoginSerializer, RegistrationSerializer, InterviewSerializer, RoleSerializer, BatchSerializer,
+)
+from .models import User, Interview, InterviewRollup, Roles
+from .parsers import MessagePackParser, NDJSONParser
+from .pagination import KeysetPagination, CalendarKeysetPagination
+from .cache import WindowCacheMixin
+from .routers import ReplicaReadMixin, replica_reads
+from .conditional import (
+    ConditionalListMixin, interview_conditional_response, set_interview_validators,
+)
+from .encoders import FastListMixin, row_encoder_for
+from .fields import parse_fields, requested_fields
+from . import changes, exports
+from .renderers import CSVRenderer, NDJSONRenderer, PrometheusRenderer
+from .metrics import registry
+from .authentication import denylist, tokens_for_user
+from .logins import last_logins
+from .intervals import find_conflicts, interview_span
+from .availability import find_common_slots
+from .windows import week_window, month_window, date_range_window, parse_date
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, QueryDict, StreamingHttpResponse
+from django.db import router, transaction
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.dateparse import parse_duration, parse_time
+from django.utils.duration import duration_string
+from django.db.models import F, Sum
+from django.db.models.functions import TruncWeek
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+import copy
 import datetime
+from . import search
+
+
+def _query_int(value, strict=False, cutoff=None):
+    """
+    A non-negative integer query parameter, positive if `strict`, capped at
+    `cutoff`. Raises ValueError otherwise.
+    """
+    number = int(value)
+    if number < 0 or (strict and number == 0):
+        raise ValueError(value)
+    return min(number, cutoff) if cutoff is not None else number
+
 
 class LoginUserView(APIView):
     def post(self, request, *args, **kwargs):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            user.last_login = timezone.now()
-            user.save(update_fields=['last_login'])
-            refresh = RefreshToken.for_user(user)
+            last_logins.record(user, timezone.now())
+            refresh = tokens_for_user(user)
             return Response({
                 'message': 'Login successful!',
                 'refresh': str(refresh),
@@ -28,6 +72,19 @@ class LoginUserView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class LogoutUserView(APIView):
+    """
+    Revoke the access token the request was made with. Revocation is per
+    process (see apis/authentication.py): other workers accept the token
+    until it expires.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        denylist.revoke_token(request.auth)
+        return Response({'message': 'Logout successful!'})
+
+
 class RegisterUserView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegistrationSerializer
@@ -52,115 +109,397 @@ class ScheduleInterviewAPI(generics.CreateAPIView):
     queryset = Interview.objects.all()
     serializer_class = InterviewSerializer
 
-class AllInterviewsAPI(generics.ListAPIView):
+class BulkScheduleInterviewAPI(generics.GenericAPIView):
+    """
+    Schedule a batch of interviews from a JSON array or an NDJSON body (or
+    MessagePack, when enabled). Pass ?all_or_nothing=true to reject the
+    batch if any row is invalid.
+    """
+    queryset = Interview.objects.all()
+    serializer_class = InterviewSerializer
+    parser_classes = [JSONParser, NDJSONParser, *([MessagePackParser] if settings.INTERVIEW_MSGPACK else [])]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['all_or_nothing'] = self.request.query_params.get('all_or_nothing', '').lower() in ('1', 'true')
+        return context
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.INTERVIEW_BULK_MAX_ROWS
+        )
+        if not serializer.is_valid():
+            # ValidationError would coerce the row numbers to strings, so report the rows as collected
+            errors = serializer.row_errors or serializer.errors
+            return Response({"created": 0, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        interviews = serializer.save()
+        return Response({
+            "created": len(interviews),
+            "ids": [interview.id for interview in interviews],
+            "errors": serializer.row_errors,
+        }, status=status.HTTP_201_CREATED)
+
+class AllInterviewsAPI(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     queryset = Interview.objects.all().order_by('id')
     serializer_class = InterviewSerializer
+    pagination_class = KeysetPagination
 
-class InterviewsByDateAPI(generics.ListAPIView):
+class InterviewsByDateAPI(ConditionalListMixin, ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     serializer_class = InterviewSerializer
 
     def get_queryset(self):
         date = self.request.query_params.get('date')
         return Interview.objects.filter(date=date).order_by('id')
 
-class InterviewsByWeekAPI(generics.ListAPIView):
+class InterviewsByWeekAPI(ConditionalListMixin, ReplicaReadMixin, WindowCacheMixin, FastListMixin,
+                          generics.ListAPIView):
     serializer_class = InterviewSerializer
 
+    def get_window(self):
+        return week_window(days=7)  # Monday to Sunday
+
     def get_queryset(self):
-        today = timezone.now().date()
-        start_of_week = today - datetime.timedelta(days=today.weekday())
-        end_of_week = start_of_week + datetime.timedelta(days=6)  # Sunday
+        start_of_week, end_of_week = self.get_window()
 
         return Interview.objects.filter(
             date__gte=start_of_week,
             date__lte=end_of_week
         ).order_by('id')
 
-class InterviewsByWorkWeekAPI(generics.ListAPIView):
+class InterviewsByWorkWeekAPI(ConditionalListMixin, ReplicaReadMixin, WindowCacheMixin, FastListMixin,
+                              generics.ListAPIView):
     serializer_class = InterviewSerializer
 
+    def get_window(self):
+        return week_window(days=5)  # Monday to Friday
+
     def get_queryset(self):
-        today = timezone.now().date()
-        start_of_week = today - datetime.timedelta(days=today.weekday())
-        end_of_week = start_of_week + datetime.timedelta(days=4)  # Friday
+        start_of_week, end_of_week = self.get_window()
 
         return Interview.objects.filter(
             date__gte=start_of_week,
             date__lte=end_of_week
         ).order_by('id')
 
-class InterviewsByMonthAPI(generics.ListAPIView):
+class InterviewsByMonthAPI(ConditionalListMixin, ReplicaReadMixin, WindowCacheMixin, FastListMixin,
+                           generics.ListAPIView):
     serializer_class = InterviewSerializer
+    pagination_class = CalendarKeysetPagination
+    window_params = ('month', 'year')
 
-    def get_queryset(self):
-        month = self.request.query_params.get('month')
-        year = self.request.query_params.get('year')
+    def get_window(self):
+        # Defaults to the current month if month or year is missing
+        return month_window(
+            self.request.query_params.get('month'),
+            self.request.query_params.get('year'),
+        )
 
-        # If month and year are provided in the query parameters, filter based on them
-        if month and year:
-            try:
-                month = int(month)
-                year = int(year)
-
-                # Check if the month and year are valid
-                if month < 1 or month > 12:
-                    return Response({
-                        "error": "Month must be between 1 and 12."
-                    }, status=status.HTTP_400_BAD_REQUEST)
-
-                # Calculate the start and end dates of the month
-                start_date = datetime.date(year, month, 1)
-                if month == 12:
-                    end_date = datetime.date(year + 1, 1, 1)  # January of the next year
-                else:
-                    end_date = datetime.date(year, month + 1, 1)  # First day of the next month
-
-                # Filter interviews based on the calculated range
-                return Interview.objects.filter(date__range=[start_date, end_date]).order_by('id')
+    def get_queryset(self):
+        start_of_month, end_of_month = self.get_window()
 
-            except ValueError:
-                return Response({
-                    "error": "Invalid year or month format. Both must be integers."
-                }, status=status.HTTP_400_BAD_REQUEST)
+        return Interview.objects.filter(
+            date__gte=start_of_month,
+            date__lte=end_of_month
+        ).order_by('id')
 
-        # If no month and year are provided, default to the current month
-        else:
-            today = timezone.now().date()
-            start_of_month = today.replace(day=1)  # First day of the current month
-            # Calculate the last day of the current month
-            next_month = start_of_month + datetime.timedelta(days=31)
-            start_of_next_month = next_month.replace(day=1)
-            end_of_month = start_of_next_month - datetime.timedelta(days=1)  # Last day of the current month
-
-            # Return interviews for the current month
-            return Interview.objects.filter(
-                date__gte=start_of_month,
-                date__lte=end_of_month
-            ).order_by('id')
-
-class InterviewsByDateRangeAPI(generics.ListAPIView):
+class InterviewsByDateRangeAPI(ConditionalListMixin, ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     serializer_class = InterviewSerializer
+    pagination_class = CalendarKeysetPagination
 
     def get_queryset(self):
         start_date = self.request.query_params.get('start_date')
         end_date = self.request.query_params.get('end_date')
 
         if start_date and end_date:
-            try:
-                # Convert to date objects
-                start_date = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
-                end_date = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+            start_date, end_date = date_range_window(start_date, end_date)
+            return Interview.objects.filter(date__range=[start_date, end_date]).order_by('id')
+        
+        return Interview.objects.none()
+
+class InterviewExportAPI(generics.GenericAPIView):
+    """
+    Stream interviews as NDJSON (default) or CSV, chosen with ?format= or the
+    Accept header. Filters: date, start_date/end_date, month/year, department.
+    Rows are read in INTERVIEW_EXPORT_CHUNK_SIZE chunks (a server-side cursor
+    on PostgreSQL) and written as they are read, so memory stays flat under
+    WSGI and ASGI alike. A whole-month export is served from its snapshot
+    file when one is current.
+    """
+    serializer_class = InterviewSerializer
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = Interview.objects.all()
+
+        if params.get('date'):
+            queryset = queryset.filter(date=parse_date(params['date']))
+        if params.get('start_date') and params.get('end_date'):
+            start_date, end_date = date_range_window(params['start_date'], params['end_date'])
+            queryset = queryset.filter(date__range=[start_date, end_date])
+        if params.get('month') and params.get('year'):
+            start_date, end_date = month_window(params['month'], params['year'])
+            queryset = queryset.filter(date__range=[start_date, end_date])
+        if params.get('department'):
+            queryset = queryset.filter(department=params['department'])
+        return queryset.order_by('date', 'time', 'id')
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        filename = f'interviews.{renderer.format}'
+        snapshot = self.get_snapshot(renderer)
+        if snapshot is not None:
+            return FileResponse(snapshot, as_attachment=True, filename=filename, content_type=renderer.media_type)
+
+        serializer_class = self.get_serializer_class()
+        # Under ASGI only an async iterator is sent as it is produced
+        export = exports.aexport_chunks if isinstance(request._request, ASGIRequest) else exports.export_chunks
+        content = export(
+            self.get_queryset(), renderer, serializer_class, requested_fields(request, serializer_class),
+        )
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_snapshot(self, renderer):
+        """The month's snapshot file for a plain ?month=&year= export, if current."""
+        params = self.request.query_params
+        if not settings.INTERVIEW_EXPORT_SNAPSHOTS or set(params) - {'month', 'year', 'format'}:
+            return None
+        if not (params.get('month') and params.get('year')):
+            return None
+        start_date, _ = month_window(params['month'], params['year'])
+        return exports.open_month_snapshot(start_date.year, start_date.month, renderer)
+
+class InterviewChangeStreamAPI(APIView):
+    """
+    Server-sent events for interview changes, so a dashboard can follow them
+    instead of polling (see apis/changes.py). Filters: start_date/end_date,
+    department. Each event's id is its sequence number; a reconnecting client
+    sends the last one back as Last-Event-ID (or ?last_event_id=) to resume.
+    Served by async_views.EventStreamView, under ASGI only; under WSGI clients
+    poll InterviewSyncAPI instead.
+    """
 
-                return Interview.objects.filter(date__range=[start_date, end_date]).order_by('id')
+    def stream(self, request, *args, **kwargs):
+        params = request.query_params
+        start_date = end_date = None
+        if params.get('start_date') or params.get('end_date'):
+            start_date, end_date = date_range_window(params.get('start_date'), params.get('end_date'))
 
+        last_event_id = request.headers.get('Last-Event-ID') or params.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = _query_int(last_event_id)
             except ValueError:
-                return Response({
-                    "error": "Invalid date format. Use YYYY-MM-DD."
-                }, status=status.HTTP_400_BAD_REQUEST)
-        
-        return Interview.objects.none()
+                return Response({"error": "Last-Event-ID must be a change sequence number."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        events = changes.change_events(last_event_id, start_date, end_date, params.get('department'))
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Tell nginx not to hold events back in its buffer
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class InterviewSyncAPI(ReplicaReadMixin, APIView):
+    """
+    Interviews created, updated or deleted since a client's sync token
+    (?since=), so a client stays current without downloading every interview
+    again. Call it without `since` to get the current token before a full
+    download; changes made during the download are replayed on the next sync.
+    Follow `next` while `more` is true. A token older than the retained log
+    gets 410 Gone: the client has to download everything again.
+    """
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        if params.get('since') is None:
+            return Response({'interviews': [], 'deleted': [], 'next': changes.latest_sequence(), 'more': False})
+
+        try:
+            since = _query_int(params['since'])
+            limit = _query_int(params.get('limit', settings.INTERVIEW_PAGE_SIZE), strict=True,
+                               cutoff=settings.INTERVIEW_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "Invalid since or limit."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return Response(changes.changes_since(since, limit))
+        except changes.LogExpired:
+            return Response({"error": "Sync token has expired; download all interviews again."},
+                            status=status.HTTP_410_GONE)
+
+
+class InterviewConflictsAPI(APIView):
+    """
+    Report overlapping interviews of the same interviewer between start_date
+    and end_date (optionally within one department).
+    """
+
+    def get(self, request, *args, **kwargs):
+        start_date, end_date = date_range_window(
+            request.query_params.get('start_date'), request.query_params.get('end_date')
+        )
+        interviews = Interview.objects.filter(
+            date__range=[start_date, end_date]
+        ).exclude(interviewer__isnull=True).exclude(interviewer='')
+        if request.query_params.get('department'):
+            interviews = interviews.filter(department=request.query_params['department'])
+
+        rows = interviews.order_by('interviewer', 'date', 'time').values_list(
+            'interviewer', 'date', 'time', 'duration', 'id'
+        )
+        bookings = (
+            (interviewer, *interview_span(date, time, duration), pk)
+            for interviewer, date, time, duration, pk in rows.iterator()
+        )
+        conflicts = [
+            {
+                "interviewer": interviewer,
+                "interviews": [first, second],
+                "overlap_start": overlap_start.isoformat(),
+                "overlap_end": overlap_end.isoformat(),
+            }
+            for interviewer, first, second, overlap_start, overlap_end in find_conflicts(bookings)
+        ]
+        return Response({"conflicts": conflicts}, status=status.HTTP_200_OK)
+
+class InterviewerAvailabilityAPI(APIView):
+    """
+    Earliest common free slots for a set of interviewers.
+
+    Query parameters: interviewers (comma-separated or repeated), start_date,
+    end_date, duration (minutes or HH:MM:SS), optional day_start / day_end
+    (working hours, default 09:00-17:00), limit and include_weekends.
+    """
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        interviewers = [
+            name.strip() for value in params.getlist('interviewers') for name in value.split(',') if name.strip()
+        ]
+        if not interviewers:
+            return Response({"error": "At least one interviewer is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_date, end_date = date_range_window(params.get('start_date'), params.get('end_date'))
+        if end_date < start_date or (end_date - start_date).days >= settings.AVAILABILITY_MAX_DAYS:
+            return Response({
+                "error": f"The date range must be ordered and span at most {settings.AVAILABILITY_MAX_DAYS} days."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            day_start = parse_time(params.get('day_start') or '09:00')
+            day_end = parse_time(params.get('day_end') or '17:00')
+        except ValueError:
+            day_start = day_end = None
+        if not (day_start and day_end and day_start < day_end):
+            return Response({"error": "Invalid working hours. Use HH:MM."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            duration = _availability_duration(params.get('duration', ''))
+        except ValueError:
+            return Response({
+                "error": f"Invalid duration. Use minutes or HH:MM:SS, at most "
+                         f"{settings.AVAILABILITY_MAX_DURATION_MINUTES} minutes."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = _query_int(params.get('limit', 10), strict=True, cutoff=settings.AVAILABILITY_MAX_SLOTS)
+        except ValueError:
+            return Response({"error": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+
+        slots = find_common_slots(
+            interviewers, start_date, end_date, day_start, day_end, duration, limit,
+            include_weekends=params.get('include_weekends', '').lower() in ('1', 'true'),
+        )
+        return Response({
+            "interviewers": interviewers,
+            "slots": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in slots],
+        }, status=status.HTTP_200_OK)
+
+
+def _availability_duration(value):
+    """
+    The slot length asked for, in minutes or HH:MM:SS. Raises ValueError
+    unless it is positive and at most AVAILABILITY_MAX_DURATION_MINUTES.
+    """
+    try:
+        duration = datetime.timedelta(minutes=int(value)) if value.isdigit() else parse_duration(value)
+    except OverflowError:
+        raise ValueError(value)
+    limit = datetime.timedelta(minutes=settings.AVAILABILITY_MAX_DURATION_MINUTES)
+    if duration is None or not datetime.timedelta(0) < duration <= limit:
+        raise ValueError(value)
+    return duration
+
+
+class InterviewStatsAPI(APIView):
+    """
+    Interview counts and total duration per day (or week), department and
+    role, read from the rollup table (apis/rollups.py) rather than the
+    interviews themselves.
+
+    Query parameters: start_date and end_date (default: the current week),
+    group_by ("day" or "week"), and optional department and role filters.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if request.query_params.get('start_date') or request.query_params.get('end_date'):
+            start_date, end_date = date_range_window(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+        else:
+            start_date, end_date = week_window(days=7)
+        if end_date < start_date:
+            return Response({"error": "end_date must not be before start_date."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= settings.INTERVIEW_STATS_MAX_DAYS:
+            return Response({"error": f"The range may span at most {settings.INTERVIEW_STATS_MAX_DAYS} days."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = request.query_params.get('group_by', 'day')
+        if group_by not in ('day', 'week'):
+            return Response({"error": "group_by must be day or week."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rollups = InterviewRollup.objects.filter(date__range=[start_date, end_date], count__gt=0)
+        for field in ('department', 'role'):
+            if request.query_params.get(field):
+                rollups = rollups.filter(**{field: request.query_params[field]})
+        period = F('date') if group_by == 'day' else TruncWeek('date')
+        buckets = list(rollups.annotate(period=period).values('period', 'department', 'role').annotate(
+            interviews=Sum('count'), duration=Sum('total_duration'),
+        ).order_by('period', 'department', 'role'))
+
+        rows = [
+            {
+                "period": bucket['period'].isoformat(),
+                "department": bucket['department'],
+                "role": bucket['role'],
+                "count": bucket['interviews'],
+                "total_duration": duration_string(bucket['duration']),
+            }
+            for bucket in buckets
+        ]
+        return Response({
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "group_by": group_by,
+            "buckets": rows,
+            "total": {
+                "count": sum(bucket['interviews'] for bucket in buckets),
+                "total_duration": duration_string(sum((bucket['duration'] for bucket in buckets), datetime.timedelta())),
+            },
+        }, status=status.HTTP_200_OK)
+
+class MetricsAPI(APIView):
+    """Request metrics of this worker process, for Prometheus to scrape."""
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request, *args, **kwargs):
+        return Response(registry.render(), status=status.HTTP_200_OK)
 
-class GetRolesView(generics.ListAPIView):
+class GetRolesView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = RoleSerializer
 
     def get_queryset(self):
@@ -174,61 +513,220 @@ class GetRolesView(generics.ListAPIView):
             "message": "Roles retrieved successfully"
         }, status=status.HTTP_200_OK)
     
-class InterviewsByDepartmentAPI(generics.ListAPIView):
+class InterviewsByDepartmentAPI(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     serializer_class = InterviewSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         department = self.request.query_params.get('department')
         if department:
-            return Interview.objects.filter(department=department)
+            return Interview.objects.filter(department=department).order_by('id')
         return Interview.objects.all().order_by('id')
     
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+    def list(self, request, *args, **kwargs):
+        return self.page_response(self.paginate_queryset(self.get_rows()))
+
+    async def alist(self, request, *args, **kwargs):
+        return self.page_response(await self.apaginate_rows(self.get_rows()))
+
+    def page_response(self, page):
         return Response({
-            "interviews": serializer.data,
+            "interviews": self.get_row_encoder().encode(page),
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
         }, status=status.HTTP_200_OK)
 
 class GetUpdateDestroyInterviewAPI(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Interview.objects.all()
+    """
+    Responses carry the interview's ETag and Last-Modified. GET honours
+    If-None-Match and If-Modified-Since; PUT, PATCH and DELETE honour
+    If-Match and If-Unmodified-Since, checked with the row locked until the
+    write commits (see apis/conditional.py).
+    """
     serializer_class = InterviewSerializer
 
+    def get_queryset(self):
+        if self.request.method in ('PUT', 'PATCH', 'DELETE'):
+            return Interview.objects.select_for_update()
+        fields = requested_fields(self.request, self.serializer_class)
+        if fields is not None:
+            # updated_at makes the ETag
+            return Interview.objects.only(*fields, 'updated_at')
+        return Interview.objects.all()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs['fields'] = requested_fields(self.request, self.serializer_class)
+        return super().get_serializer(*args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        response = interview_conditional_response(request, instance)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_interview_validators(response, instance)
+
+    @transaction.atomic
     def delete(self, request, *args, **kwargs):
         """Customized delete response to confirm deletion"""
         instance = self.get_object()
+        response = interview_conditional_response(request, instance)
+        if response is not None:
+            return response
         self.perform_destroy(instance)
         return Response({"message": "Interview deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         """Customized update response to provide feedback"""
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        response = interview_conditional_response(request, instance)
+        if response is not None:
+            return response
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response({
+        return set_interview_validators(Response({
             "message": "Interview updated successfully",
             "interview": serializer.data
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK), instance)
+
+# Read endpoints a batch can run, by the name a query gives: (URL name, view)
+BATCH_ENDPOINTS = {
+    'all': ('all-interviews', AllInterviewsAPI),
+    'date': ('interviews-by-date', InterviewsByDateAPI),
+    'week': ('interviews-by-week', InterviewsByWeekAPI),
+    'work-week': ('interviews-by-work-week', InterviewsByWorkWeekAPI),
+    'month': ('interviews-by-month', InterviewsByMonthAPI),
+    'date-range': ('interviews-by-date-range', InterviewsByDateRangeAPI),
+    'department': ('interviews-by-department', InterviewsByDepartmentAPI),
+    'roles': ('get-roles', GetRolesView),
+}
+
+
+class BatchAPI(ReplicaReadMixin, APIView):
+    """
+    Several reads in one request, for pages that would otherwise fan out.
+
+    `interviews` lists interview ids, fetched with one query (limited by
+    `fields`, as ?fields= limits a listing). `queries` maps
+    names of the caller's choosing to `{"endpoint": ..., "params": {...}}`,
+    an endpoint of BATCH_ENDPOINTS and its query parameters. Each query runs
+    its view in process, as this request's user and on this request's
+    database connection, without ETags. Every interview row appears once,
+    under `interviews` keyed by id; query results list the ids in its place.
+    A failing query reports its status and error without failing the rest.
+    POST only carries the body: it writes nothing, so it does not pin the
+    client to the primary (see urls.py).
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data['interviews']
+
+        interviews = {}
+        if ids:
+            encoder = row_encoder_for(
+                InterviewSerializer, parse_fields(serializer.validated_data.get('fields'), InterviewSerializer),
+            )
+            rows = Interview.objects.filter(pk__in=ids).values_list(*encoder.columns)
+            interviews.update((row['id'], row) for row in encoder.encode(rows))
+        missing = [pk for pk in dict.fromkeys(ids) if pk not in interviews]
+
+        results = {
+            name: self.run_query(request, query, interviews)
+            for name, query in serializer.validated_data['queries'].items()
+        }
+        return Response({"interviews": interviews, "missing": missing, "results": results})
+
+    def run_query(self, request, query, interviews):
+        if query['endpoint'] not in BATCH_ENDPOINTS:
+            return {"status": status.HTTP_400_BAD_REQUEST, "data": {"error": "Unknown endpoint."}}
+        url_name, view_class = BATCH_ENDPOINTS[query['endpoint']]
+        initkwargs = {'conditional': False} if issubclass(view_class, ConditionalListMixin) else {}
+        response = view_class.as_view(**initkwargs)(_batch_subrequest(request, reverse(url_name), query['params']))
+
+        data = response.data
+        if response.status_code == status.HTTP_200_OK and issubclass(view_class, FastListMixin):
+            data = _replace_rows_with_ids(data, interviews)
+        return {"status": response.status_code, "data": data}
+
+
+def _batch_subrequest(request, path, params):
+    """
+    A GET of `path` with `params`. It keeps the request's headers, so the
+    view authenticates it from the same credentials.
+    """
+    subrequest = copy.copy(request._request)
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.GET = QueryDict(mutable=True)
+    subrequest.GET.update(params)
+    subrequest.META = {**subrequest.META, 'REQUEST_METHOD': 'GET', 'QUERY_STRING': subrequest.GET.urlencode()}
+    return subrequest
+
+
+def _replace_rows_with_ids(data, interviews):
+    """Move a listing's interview rows into `interviews`, leaving their ids."""
+    def ids(rows):
+        for row in rows:
+            # Queries with different ?fields= each add theirs
+            interviews[row['id']] = {**interviews.get(row['id'], {}), **row}
+        return [row['id'] for row in rows]
+
+    if isinstance(data, list):
+        return ids(data)
+    # A page: rows under 'results', or 'interviews' for the department listing
+    key = 'results' if 'results' in data else 'interviews'
+    return {**data, key: ids(data[key])}
+
 
 @api_view(['GET'])
+@replica_reads
 def search_users(request):
     """
     API to search users based on query (name, email, or phone).
+    Results are ranked by relevance and paged with an opaque cursor.
     """
     query = request.query_params.get('q', '').strip()
-    if query:
-        # Filter users by name, email, or phone
-        users = User.objects.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(phone__icontains=query)
-        ).distinct()
-
-        # Serialize the data
-        results = users.values('id', 'first_name', 'last_name', 'email')
-        return Response({"users": list(results)}, status=status.HTTP_200_OK)
-
-    return Response({"users": []}, status=status.HTTP_200_OK)
\ No newline at end of file
+    if not query:
+        return Response({"users": [], "next": None}, status=status.HTTP_200_OK)
+
+    try:
+        limit = _query_int(request.query_params.get('limit', settings.USER_SEARCH_LIMIT), strict=True,
+                           cutoff=settings.USER_SEARCH_MAX_LIMIT)
+        offset = _decode_search_cursor(request.query_params.get('cursor'))
+    except ValueError:
+        return Response({"error": "Invalid limit or cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Fetch one extra row to know whether another page follows
+    users = search.search_users(query, limit + 1, offset, using=router.db_for_read(User))
+    next_url = None
+    if len(users) > limit and offset + limit < settings.USER_SEARCH_MAX_RESULTS:
+        next_url = replace_query_param(
+            request.build_absolute_uri(), 'cursor', _encode_search_cursor(offset + limit)
+        )
+    return Response({"users": users[:limit], "next": next_url}, status=status.HTTP_200_OK)
+
+
+def _encode_search_cursor(offset):
+    return urlsafe_b64encode(f'o={offset}'.encode('ascii')).decode('ascii')
+
+
+def _decode_search_cursor(cursor):
+    """
+    Ranked results have no stable key to seek on, so the cursor is an
+    offset, capped at USER_SEARCH_MAX_RESULTS to bound the work per query.
+    """
+    if not cursor:
+        return 0
+    try:
+        token = urlsafe_b64decode(cursor.encode('ascii')).decode('ascii')
+    except (TypeError, UnicodeError, binascii.Error):
+        raise ValueError(cursor)
+    if not token.startswith('o='):
+        raise ValueError(cursor)
+    return _query_int(token[2:], cutoff=settings.USER_SEARCH_MAX_RESULTS)
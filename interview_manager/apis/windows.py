@@ -0,0 +1,51 @@
+"""
+Date windows behind the calendar endpoints.
+
+Each helper returns an inclusive `(start, end)` pair of dates and raises a
+400 ValidationError on malformed input, so views, caches and exports all
+agree on what a given request covers.
+"""
+import calendar
+import datetime
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def week_window(days=7, today=None):
+    """The current week from Monday; `days=5` stops at Friday."""
+    today = today or timezone.now().date()
+    start_of_week = today - datetime.timedelta(days=today.weekday())
+    return start_of_week, start_of_week + datetime.timedelta(days=days - 1)
+
+
+def month_window(month=None, year=None, today=None):
+    """The given calendar month, or the current one if either part is missing."""
+    if not (month and year):
+        today = today or timezone.now().date()
+        month, year = today.month, today.year
+
+    try:
+        month = int(month)
+        year = int(year)
+    except (TypeError, ValueError):
+        raise ValidationError({"error": "Invalid year or month format. Both must be integers."})
+
+    if month < 1 or month > 12:
+        raise ValidationError({"error": "Month must be between 1 and 12."})
+    if not datetime.MINYEAR <= year <= datetime.MAXYEAR:
+        raise ValidationError({"error": "Invalid year or month format. Both must be integers."})
+
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+
+
+def parse_date(value):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValidationError({"error": "Invalid date format. Use YYYY-MM-DD."})
+
+
+def date_range_window(start_date, end_date):
+    return parse_date(start_date), parse_date(end_date)
@@ -0,0 +1,16 @@
+"""
+Celery application for background jobs (apis/tasks.py).
+
+Configured from the CELERY_* Django settings. Start a worker with
+
+    celery -A interview_manager worker
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'interview_manager.settings')
+
+app = Celery('interview_manager')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import copy
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from importlib.util import find_spec
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apis.middleware.MetricsMiddleware',
+    # Inside the metrics, so response sizes are what went over the wire
+    'apis.compression.CompressionMiddleware',
+    'apis.routers.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +88,14 @@ WSGI_APPLICATION = 'interview_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connection reuse: a psycopg pool per process when psycopg_pool is
+# installed, otherwise one persistent connection per thread for
+# DB_CONN_MAX_AGE seconds. The pool always checks a connection before handing
+# it out; DB_HEALTH_CHECKS only covers persistent connections.
+# `manage.py benchmark connections` compares them.
+DB_POOL = config('DB_POOL', default=find_spec('psycopg_pool') is not None, cast=bool)
+DB_HEALTH_CHECKS = config('DB_HEALTH_CHECKS', default=True, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -90,12 +104,101 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT', default='5432'),
-        # 'OPTIONS': {
-        #     'sslmode': 'require',
-        # }
+        # Pooled connections are returned to the pool instead of persisting
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': DB_HEALTH_CHECKS,
+        'OPTIONS': {
+            # 'sslmode': 'require',
+        },
+    }
+}
+
+if DB_POOL:
+    # Sizes are per process: keep DB_POOL_MAX_SIZE x processes under the
+    # server's max_connections
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        # Seconds a request waits for a free connection before failing
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        # Idle connections above min_size are closed after this many seconds
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        # Connections are replaced after this many seconds
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+    }
+
+# Optional read replica for the read-only list views (see apis/routers.py).
+# Tests read it through the default database.
+if config('DB_REPLICA_HOST', default=''):
+    # A deep copy, so the replica gets its own OPTIONS and pool settings
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': config('DB_REPLICA_HOST'),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['apis.routers.ReplicaRouter']
+
+# Seconds a client reads from the primary after a write; keep it above the
+# replica's usual lag so clients read their own writes
+DATABASE_PRIMARY_PIN_SECONDS = config('DATABASE_PRIMARY_PIN_SECONDS', default=5, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory unless REDIS_URL is set; tests always run on locmem.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a cached calendar response may live (see apis/cache.py)
+INTERVIEW_CACHE_TIMEOUT = config('INTERVIEW_CACHE_TIMEOUT', default=300, cast=int)
+
+# Background jobs (see interview_manager/celery.py and apis/tasks.py)
+# With the default in-memory broker there is no worker, so tasks run inline
+# as soon as the write that queued them commits; point CELERY_BROKER_URL at
+# Redis (e.g. redis://localhost:6379/1) to run them on `celery worker`.
+
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='memory://')
+CELERY_TASK_ALWAYS_EAGER = config(
+    'CELERY_TASK_ALWAYS_EAGER', default=CELERY_BROKER_URL.startswith('memory://'), cast=bool,
+)
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+# Tasks are idempotent, so redeliver rather than lose one a worker died on
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Periodic tasks, run by `celery beat`
+CELERY_BEAT_SCHEDULE = {
+    'prune-interview-changes': {
+        'task': 'apis.tasks.prune_interview_changes',
+        'schedule': timedelta(hours=1),
+    },
 }
 
+# Interview notifications: off unless enabled, since they email candidates
+INTERVIEW_NOTIFICATIONS = config('INTERVIEW_NOTIFICATIONS', default=False, cast=bool)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='interviews@localhost')
+# How long a sent notification is remembered, so a retried task skips it
+INTERVIEW_NOTIFICATION_DEDUP_SECONDS = config('INTERVIEW_NOTIFICATION_DEDUP_SECONDS', default=86400, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -114,6 +217,66 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (see apis/hashers.py). New hashes use PASSWORD_HASHER; the
+# others are kept to verify existing hashes, which are upgraded on login.
+# Argon2 needs argon2-cffi; the defaults are OWASP's minimum for Argon2id.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2' if find_spec('argon2') else 'scrypt')
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=1, cast=int)
+PASSWORD_HASHER_CHOICES = {
+    'argon2': 'apis.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'apis.hashers.TunedScryptPasswordHasher',
+    'pbkdf2_sha256': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# last_login writes are buffered and applied in one UPDATE at most this many
+# seconds after a login (see apis/logins.py); 0 writes on every login
+LAST_LOGIN_FLUSH_SECONDS = config('LAST_LOGIN_FLUSH_SECONDS', default=10, cast=float)
+
+
+# apis logs JSON lines to stderr from a background thread (see apis/log.py).
+# Successful logins are sampled and failed-login bursts rate limited.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'apis.log.JSONFormatter'},
+    },
+    'filters': {
+        'events': {
+            '()': 'apis.log.EventFilter',
+            'events': {
+                'login.succeeded': {'sample': config('LOG_LOGIN_SUCCESS_SAMPLE', default=0.1, cast=float)},
+                'login.failed': {'rate': config('LOG_LOGIN_FAILURE_RATE', default=20, cast=int), 'per': 1.0},
+            },
+        },
+    },
+    'handlers': {
+        'apis': {
+            'class': 'apis.log.QueueingHandler',
+            'formatter': 'json',
+            'filters': ['events'],
+        },
+    },
+    'loggers': {
+        'apis': {
+            'handlers': ['apis'],
+            'level': config('LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -132,18 +295,105 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Generated files, such as export snapshots
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# MessagePack (application/msgpack) responses and request bodies alongside
+# JSON, where the msgpack package is installed
+INTERVIEW_MSGPACK = config('INTERVIEW_MSGPACK', default=find_spec('msgpack') is not None, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Builds request.user from token claims (see apis/authentication.py)
+        'apis.authentication.StatelessJWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['apis.renderers.MessagePackRenderer'] if INTERVIEW_MSGPACK else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(['apis.parsers.MessagePackParser'] if INTERVIEW_MSGPACK else []),
+    ],
 }
 
+# Response compression (see apis/compression.py): encodings in order of
+# preference, and the smallest body worth compressing. zstd comes first as
+# it matches brotli's and gzip's size for far less CPU (benchmark compression).
+COMPRESSION_ENCODINGS = config(
+    'COMPRESSION_ENCODINGS',
+    default=','.join([
+        *(['zstd'] if find_spec('zstandard') else []), *(['br'] if find_spec('brotli') else []), 'gzip',
+    ]),
+    cast=Csv(),
+)
+COMPRESSION_MIN_BYTES = config('COMPRESSION_MIN_BYTES', default=1024, cast=int)
+
+# Keyset pagination for interview listings (see apis/pagination.py)
+INTERVIEW_PAGE_SIZE = config('INTERVIEW_PAGE_SIZE', default=100, cast=int)
+INTERVIEW_MAX_PAGE_SIZE = config('INTERVIEW_MAX_PAGE_SIZE', default=1000, cast=int)
+# Rows fetched per round trip by an unpaginated async listing
+INTERVIEW_LIST_CHUNK_SIZE = config('INTERVIEW_LIST_CHUNK_SIZE', default=1000, cast=int)
+
+# Bulk scheduling: rows per request and rows per INSERT statement
+INTERVIEW_BULK_MAX_ROWS = config('INTERVIEW_BULK_MAX_ROWS', default=5000, cast=int)
+INTERVIEW_BULK_BATCH_SIZE = config('INTERVIEW_BULK_BATCH_SIZE', default=500, cast=int)
+
+# Rows fetched per round trip when streaming an export
+INTERVIEW_EXPORT_CHUNK_SIZE = config('INTERVIEW_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Keep a file per month of the export, rewritten in the background after
+# each write, and serve month exports from it (see apis/exports.py). Needs a
+# cache shared with the workers, such as Redis.
+INTERVIEW_EXPORT_SNAPSHOTS = config('INTERVIEW_EXPORT_SNAPSHOTS', default=False, cast=bool)
+INTERVIEW_EXPORT_SNAPSHOT_DIR = config('INTERVIEW_EXPORT_SNAPSHOT_DIR', default='exports')
+
+# Longest date range the rollup-backed stats endpoint answers for
+INTERVIEW_STATS_MAX_DAYS = config('INTERVIEW_STATS_MAX_DAYS', default=366, cast=int)
+
+# Free-slot finder bounds: days searched, slots returned per request and
+# the longest slot asked for
+AVAILABILITY_MAX_DAYS = config('AVAILABILITY_MAX_DAYS', default=92, cast=int)
+AVAILABILITY_MAX_SLOTS = config('AVAILABILITY_MAX_SLOTS', default=100, cast=int)
+AVAILABILITY_MAX_DURATION_MINUTES = config('AVAILABILITY_MAX_DURATION_MINUTES', default=24 * 60, cast=int)
+
+# Serve the read-only interview listings with native async views; only
+# worthwhile when running under ASGI (see apis/async_views.py)
+INTERVIEW_ASYNC_VIEWS = config('INTERVIEW_ASYNC_VIEWS', default=False, cast=bool)
+
+# Interview change feed (see apis/changes.py). 'local' wakes the streams of
+# this process only; 'redis' publishes through REDIS_URL to every process.
+CHANGE_FEED_BROKER = config('CHANGE_FEED_BROKER', default='redis' if REDIS_URL else 'local')
+# Longest an idle stream waits before re-reading the log and sending a keep-alive
+CHANGE_FEED_POLL_SECONDS = config('CHANGE_FEED_POLL_SECONDS', default=15, cast=int)
+CHANGE_FEED_BATCH_SIZE = config('CHANGE_FEED_BATCH_SIZE', default=500, cast=int)
+# Changes older than this are pruned; clients further behind get a reset
+CHANGE_FEED_RETENTION_DAYS = config('CHANGE_FEED_RETENTION_DAYS', default=7, cast=int)
+
+# Named queries per request to the batch endpoint (see apis.views.BatchAPI)
+BATCH_MAX_QUERIES = config('BATCH_MAX_QUERIES', default=20, cast=int)
+
+# Requests slower than this are logged with their SQL; 0 disables the log
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=0, cast=int)
+
+# User search typeahead (see apis/search.py)
+USER_SEARCH_LIMIT = config('USER_SEARCH_LIMIT', default=10, cast=int)
+USER_SEARCH_MAX_LIMIT = config('USER_SEARCH_MAX_LIMIT', default=50, cast=int)
+USER_SEARCH_MAX_RESULTS = config('USER_SEARCH_MAX_RESULTS', default=200, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_USER_CLASS': 'apis.authentication.ClaimsUser',
 }
+
+# Revoked tokens and users remembered per process until their tokens expire
+AUTH_DENYLIST_SIZE = config('AUTH_DENYLIST_SIZE', default=10000, cast=int)
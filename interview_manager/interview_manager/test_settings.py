@@ -0,0 +1,22 @@
+"""
+Settings for running the test suite against a separate read replica:
+
+    DJANGO_SETTINGS_MODULE=interview_manager.test_settings python manage.py test apis
+
+Both databases are SQLite, so no database server is needed. The replica's
+test database is not a mirror and never receives the rows written to
+default, so it stands in for a replica that has not caught up, and the
+routing tests (apis.tests.ReplicaRoutingTests) run instead of being skipped.
+"""
+import os
+
+# settings.py requires the PostgreSQL connection settings
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST'):
+    os.environ.setdefault(name, 'unused')
+
+from .settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+}